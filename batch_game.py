@@ -0,0 +1,295 @@
+import random
+
+import numpy as np
+
+from cards import KNOWS_NUMBER, KNOWS_SUIT, SUIT_DECK_NUMBERS
+
+NO_CARD = -1
+
+
+class BatchGame:
+    """Plays many games of a simple strategy in lockstep, one turn at a time.
+
+    The state of every game lives in numpy arrays (cards are cards.encode_card codes),
+    and each turn is a handful of array operations over all unfinished games. Hands
+    are ordered like QueuePlayer.get_hand: the first play_queue_sizes slots are the
+    play queue and the rest is the discard queue. A seed plays the same game as Game.
+    """
+
+    SUPPORTED_STRATEGIES = ("FIRST_CARD", "BASIC_QUEUE")
+    MAX_HINTS = 8
+
+    def __init__(self, num_players, strategy, seeds, use_rainbow=False, decks=None):
+        assert strategy in self.SUPPORTED_STRATEGIES, strategy
+        self.num_players = num_players
+        self.strategy = strategy
+        self.use_rainbow = use_rainbow
+        self.seeds = seeds
+        self.num_games = len(seeds)
+        self.num_suits = 6 if use_rainbow else 5
+        self.hand_size = 5 if num_players < 4 else 4
+
+        games = (self.num_games,)
+        hands = (self.num_games, num_players, self.hand_size)
+        self.current_turn = 0
+        self.turns = np.zeros(games, np.int32)
+        self.turn_timer = np.full(games, num_players, np.int32)
+        self.hints = np.full(games, self.MAX_HINTS, np.int32)
+        self.fails = np.zeros(games, np.int32)
+        self.wasted_discards = np.zeros(games, np.int32)
+        # Cards and knowledge fit in a byte, which keeps the per-turn arrays small
+        self.played_numbers = np.zeros((self.num_games, self.num_suits), np.int8)
+        self.hands = np.full(hands, NO_CARD, np.int8)
+        self.knowledge = np.zeros(hands, np.int8)
+        self.hand_sizes = np.zeros((self.num_games, num_players), np.int32)
+        self.play_queue_sizes = np.zeros((self.num_games, num_players), np.int32)
+
+        self.init_decks(decks)
+
+        all_games = np.arange(self.num_games)
+        for p in range(num_players):
+            for _ in range(self.hand_size):
+                self.draw(all_games, p)
+
+    def init_decks(self, decks=None):
+        """Shuffles every game's deck, or uses decks, a (games, cards) array of card
+        codes such as deck_corpus.DeckCorpus.get_decks, which is only read"""
+        if decks is not None:
+            self.decks = decks
+            self.deck_sizes = np.full(self.num_games, decks.shape[1], np.int32)
+            return
+
+        # Shuffled one game at a time, exactly like Game.init_deck for the same seed
+        template = []
+        for suit_index in range(self.num_suits):
+            template += [suit_index * 5 + n - 1 for n in SUIT_DECK_NUMBERS]
+        self.decks = np.empty((self.num_games, len(template)), np.int8)
+        rng = random.Random()
+        for i, seed in enumerate(self.seeds):
+            deck = template.copy()
+            rng.seed(seed)
+            rng.shuffle(deck)
+            self.decks[i] = deck
+        self.deck_sizes = np.full(self.num_games, len(template), np.int32)
+
+    def run_games(self):
+        """Plays every game to the end and returns the scores"""
+        max_score = 5 * self.num_suits
+        while True:
+            games = np.flatnonzero(
+                (self.fails < 3)
+                & (self.turn_timer >= 0)
+                & (self.get_scores() < max_score)
+            )
+            if not games.size:
+                break
+
+            player = self.current_turn % self.num_players
+            if self.strategy == "FIRST_CARD":
+                self.run_first_card_turn(games, player)
+            else:
+                self.run_basic_queue_turn(games, player)
+
+            self.turn_timer[games[self.deck_sizes[games] == 0]] -= 1
+            self.turns[games] += 1
+            self.current_turn += 1
+
+        return self.get_scores()
+
+    def get_scores(self):
+        return self.played_numbers.sum(axis=1)
+
+    def run_first_card_turn(self, games, player):
+        cards = self.remove_cards(games, player, np.zeros(games.size, np.int32))
+        self.draw(games, player)
+        self.play_cards(games, cards)
+
+    def run_basic_queue_turn(self, games, player):
+        self.adjust_queues(games, player)
+
+        playing = self.play_queue_sizes[games, player] > 0
+        play_games = games[playing]
+        cards = self.remove_cards(
+            play_games, player, np.zeros(play_games.size, np.int32)
+        )
+        self.play_queue_sizes[play_games, player] -= 1
+        self.play_cards(play_games, cards)
+        self.draw(play_games, player)
+
+        games = games[~playing]
+        has_hint, receivers, slots, suit_hints = self.find_hints(games, player)
+        hinting = has_hint & (self.hints[games] > 0)
+        self.give_hints(
+            games[hinting], receivers[hinting], slots[hinting], suit_hints[hinting]
+        )
+
+        # The play queue is empty here, so the discard queue starts at slot 0
+        discard_games = games[~hinting]
+        self.remove_cards(discard_games, player, np.zeros(discard_games.size, np.int32))
+        self.discard_cards(discard_games)
+        self.draw(discard_games, player)
+
+    def adjust_queues(self, games, player):
+        """QueuePlayer.adjust_queues for one player in each of the games"""
+        hands = self.hands[games, player]
+        knowledge = self.knowledge[games, player]
+        played_numbers = self.played_numbers[games]
+        valid = hands != NO_CARD
+        suits = np.where(valid, hands // 5, 0)
+        numbers = hands % 5 + 1
+        slots = np.arange(self.hand_size)
+        in_play_queue = slots < self.play_queue_sizes[games, player][:, None]
+
+        # 6 means the suit is complete, so nothing in it is needed any more
+        needed = played_numbers + 1
+        card_needed = np.take_along_axis(needed, suits, axis=1)
+        incomplete = played_numbers < 5
+        lowest_needed = np.where(incomplete, needed, 99).min(axis=1)[:, None]
+        needed_bits = np.bitwise_or.reduce(
+            np.where(incomplete, np.left_shift(1, needed), 0), axis=1
+        )
+        number_needed = (np.right_shift(needed_bits[:, None], numbers) & 1) == 1
+
+        knows_suit = (knowledge & KNOWS_SUIT) != 0
+        knows_number = (knowledge & KNOWS_NUMBER) != 0
+        knows_both = knows_suit & knows_number
+        only_suit = knows_suit & ~knows_number
+        only_number = knows_number & ~knows_suit
+
+        unplayable = (
+            (knows_both & (numbers < card_needed))
+            | (only_suit & (card_needed == 6))
+            | (only_number & (numbers < lowest_needed))
+        )
+        can_play_now = knows_both & ~unplayable & (numbers == card_needed)
+        can_play_later = (knows_both & ~unplayable & ~can_play_now) | (
+            only_number & ~unplayable & ~number_needed
+        )
+        unknown = valid & ~unplayable & ~can_play_now & ~can_play_later
+
+        # Sort keys that reproduce the queue concatenations and the stable sort of
+        # the new play queue by hinted number (or needed number of the hinted suit)
+        to_play = (unknown & in_play_queue) | can_play_now
+        play_key = np.where(knows_number, numbers, card_needed).astype(
+            np.int32
+        ) * 100 + (can_play_now * self.hand_size + slots)
+        discard_group = np.where(unplayable, 0, np.where(unknown, 1, 2))
+        discard_key = 10000 + discard_group * 100 + slots
+        keys = np.where(to_play, play_key, np.where(valid, discard_key, 99999))
+
+        self.reorder_hands(games, player, np.argsort(keys, axis=1))
+        self.play_queue_sizes[games, player] = to_play.sum(axis=1)
+
+    def find_hints(self, games, player):
+        """The first hint BasicQueuePlayer.find_hints would give in each game.
+
+        Returns whether there is a hint, the player receiving it, the slot of the
+        target card and whether it is a suit hint. A suit hint is given when the
+        target is the first card of its suit in the discard queue, otherwise a number
+        hint."""
+        hands = self.hands[games]
+        valid = hands != NO_CARD
+        suits = np.where(valid, hands // 5, 0)
+        numbers = hands % 5 + 1
+        in_discard_queue = valid & (
+            np.arange(self.hand_size) >= self.play_queue_sizes[games][:, :, None]
+        )
+
+        played_numbers = np.take_along_axis(
+            self.played_numbers[games][:, None, :],
+            suits.reshape(games.size, 1, self.num_players * self.hand_size),
+            axis=2,
+        ).reshape(suits.shape)
+        playable = in_discard_queue & (played_numbers == numbers - 1)
+
+        # Walk the slots in order, keeping bitmasks of the suits and numbers already
+        # seen in each discard queue
+        first_of_suit = np.empty_like(in_discard_queue)
+        first_of_number = np.empty_like(in_discard_queue)
+        seen_suits = np.zeros(in_discard_queue.shape[:2], np.int32)
+        seen_numbers = np.zeros(in_discard_queue.shape[:2], np.int32)
+        for slot in range(self.hand_size):
+            in_queue = in_discard_queue[:, :, slot]
+            suit_bits = np.left_shift(1, suits[:, :, slot])
+            number_bits = np.left_shift(1, numbers[:, :, slot])
+            first_of_suit[:, :, slot] = (seen_suits & suit_bits) == 0
+            first_of_number[:, :, slot] = (seen_numbers & number_bits) == 0
+            seen_suits |= np.where(in_queue, suit_bits, 0)
+            seen_numbers |= np.where(in_queue, number_bits, 0)
+
+        candidates = playable & (first_of_suit | first_of_number)
+        candidates[:, player, :] = False
+        candidates = candidates.reshape(games.size, self.num_players * self.hand_size)
+        has_hint = candidates.any(axis=1)
+        first = candidates.argmax(axis=1)
+        suit_hints = first_of_suit.reshape(
+            games.size, self.num_players * self.hand_size
+        )[np.arange(games.size), first]
+        return has_hint, first // self.hand_size, first % self.hand_size, suit_hints
+
+    def give_hints(self, games, receivers, slots, suit_hints):
+        targets = self.hands[games, receivers, slots]
+        hands = self.hands[games, receivers]
+        valid = hands != NO_CARD
+        matches_suit = valid & (hands // 5 == (targets // 5)[:, None])
+        matches_number = valid & (hands % 5 == (targets % 5)[:, None])
+        matches = np.where(suit_hints[:, None], matches_suit, matches_number)
+        bit = np.where(suit_hints, KNOWS_SUIT, KNOWS_NUMBER)[:, None]
+        self.knowledge[games, receivers] |= np.where(matches, bit, 0)
+
+        # The target is the first match in the discard queue; it moves to the back
+        # of the play queue
+        keys = np.arange(self.hand_size) * 2
+        keys = np.broadcast_to(keys, (games.size, self.hand_size)).copy()
+        keys[np.arange(games.size), slots] = (
+            self.play_queue_sizes[games, receivers] * 2 - 1
+        )
+        self.reorder_hands(games, receivers, np.argsort(keys, axis=1))
+        self.play_queue_sizes[games, receivers] += 1
+        self.hints[games] -= 1
+
+    def reorder_hands(self, games, players, order):
+        self.hands[games, players] = np.take_along_axis(
+            self.hands[games, players], order, axis=1
+        )
+        self.knowledge[games, players] = np.take_along_axis(
+            self.knowledge[games, players], order, axis=1
+        )
+
+    def remove_cards(self, games, player, slots):
+        """Takes the card at slots out of the player's hand, shifting later cards up"""
+        cards = self.hands[games, player, slots]
+        positions = np.arange(self.hand_size)[None, :]
+        order = np.minimum(
+            positions + (positions >= slots[:, None]), self.hand_size - 1
+        )
+        self.reorder_hands(games, player, order)
+        self.hand_sizes[games, player] -= 1
+        last = self.hand_sizes[games, player]
+        self.hands[games, player, last] = NO_CARD
+        self.knowledge[games, player, last] = 0
+        return cards
+
+    def draw(self, games, player):
+        games = games[self.deck_sizes[games] > 0]
+        self.deck_sizes[games] -= 1
+        slots = self.hand_sizes[games, player]
+        self.hands[games, player, slots] = self.decks[games, self.deck_sizes[games]]
+        self.knowledge[games, player, slots] = 0
+        self.hand_sizes[games, player] += 1
+
+    def play_cards(self, games, cards):
+        suits = cards // 5
+        numbers = cards % 5 + 1
+        playable = self.played_numbers[games, suits] == numbers - 1
+
+        played_games = games[playable]
+        self.played_numbers[played_games, suits[playable]] += 1
+        fives = played_games[numbers[playable] == 5]
+        self.hints[fives] = np.minimum(self.hints[fives] + 1, self.MAX_HINTS)
+
+        self.fails[games[~playable]] += 1
+
+    def discard_cards(self, games):
+        self.wasted_discards[games[self.hints[games] == self.MAX_HINTS]] += 1
+        self.hints[games] = np.minimum(self.hints[games] + 1, self.MAX_HINTS)
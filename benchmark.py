@@ -0,0 +1,207 @@
+#!/usr/bin/python
+from collections import defaultdict
+import json
+import sys
+import time
+import tracemalloc
+
+import click
+from tabulate import tabulate
+
+from compact_game import CompactGame
+from game import Game
+from players import STRATEGIES
+from seeding import derive_seed
+
+# Too slow to run by default (ROLLOUT plays whole games every turn), so they are only
+# benchmarked when named with -s
+OPT_IN_STRATEGIES = ("ROLLOUT",)
+
+
+@click.command()
+@click.option("--games", "-g", "num_games", type=click.INT, default=20)
+@click.option("--strategy", "-s", "strategies", multiple=True)
+@click.option("--num-players", "-n", multiple=True, default=[2, 3, 4, 5])
+@click.option("--master-seed", type=click.INT, default=0)
+@click.option("--compact", is_flag=True, default=False)
+@click.option("--output", "-o", type=click.Path(dir_okay=False), default=None)
+@click.option("--baseline", "-b", type=click.Path(exists=True), default=None)
+@click.option("--threshold", type=click.FLOAT, default=1.5)
+@click.option(
+    "--weight",
+    "-w",
+    "param_weights",
+    multiple=True,
+    nargs=2,
+    type=click.Tuple([str, float]),
+)
+def run_benchmarks(
+    num_games,
+    strategies,
+    num_players,
+    master_seed,
+    compact,
+    output,
+    baseline,
+    threshold,
+    param_weights,
+):
+    """Measures games/sec, per-turn latency and memory of every strategy, with
+    and without rainbow, on a fixed set of seeds. Results can be saved as a JSON
+    baseline, and are compared to --baseline: a configuration that is more than
+    --threshold times slower is flagged, and the command exits with status 1."""
+    weights = defaultdict(int)
+    for p, w in param_weights:
+        weights[p] = w
+
+    game_class = CompactGame if compact else Game
+    seeds = [derive_seed(master_seed, i) for i in range(num_games)]
+    results = {}
+    default_strategies = [s for s in STRATEGIES if s not in OPT_IN_STRATEGIES]
+    for strategy in strategies or default_strategies:
+        for n in num_players:
+            for use_rainbow in (False, True):
+                results[config_name(strategy, n, use_rainbow)] = benchmark(
+                    game_class, strategy, n, use_rainbow, weights, seeds
+                )
+
+    regressions = []
+    if baseline:
+        with open(baseline) as f:
+            regressions = find_regressions(json.load(f)["results"], results, threshold)
+
+    click.echo(format_benchmarks(results, regressions))
+    if output:
+        with open(output, "w") as f:
+            json.dump(
+                {
+                    "games": num_games,
+                    "master_seed": master_seed,
+                    "engine": game_class.__name__,
+                    "results": results,
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+
+    if regressions:
+        click.echo("Regressions:")
+        for name, metric, ratio in regressions:
+            click.echo("  - {} {} is {:.2f}x worse".format(name, metric, ratio))
+        sys.exit(1)
+
+
+def config_name(strategy, num_players, use_rainbow):
+    return "{} {}p{}".format(strategy, num_players, " rainbow" if use_rainbow else "")
+
+
+class TimedGame:
+    """Mixin that records how long each turn takes"""
+
+    def run_turn(self, player, turn_number):
+        start = time.perf_counter()
+        super().run_turn(player, turn_number)
+        self.turn_times.append(time.perf_counter() - start)
+
+    def fork(self, *args, **kwargs):
+        # Forks (e.g. ROLLOUT's) time their turns into a list of their own, so only
+        # the benchmarked game's turns are reported
+        game = super().fork(*args, **kwargs)
+        game.turn_times = []
+        return game
+
+
+def benchmark(game_class, strategy, num_players, use_rainbow, weights, seeds):
+    timed_class = type("Timed" + game_class.__name__, (TimedGame, game_class), {})
+    turn_times = []
+    scores = []
+    start = time.perf_counter()
+    for seed in seeds:
+        g = timed_class(
+            num_players,
+            strategy,
+            use_rainbow,
+            should_print=False,
+            seed=seed,
+            weights=weights,
+        )
+        g.turn_times = turn_times
+        scores.append(g.run_game())
+    elapsed = time.perf_counter() - start
+
+    # Measured separately, since tracing allocations slows everything down
+    tracemalloc.start()
+    g = game_class(
+        num_players,
+        strategy,
+        use_rainbow,
+        should_print=False,
+        seed=seeds[0],
+        weights=weights,
+    )
+    game_memory, _ = tracemalloc.get_traced_memory()
+    g.run_game()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    turn_times.sort()
+    return {
+        "games_per_sec": len(seeds) / elapsed,
+        "mean_turn_us": sum(turn_times) / len(turn_times) * 1e6,
+        "p99_turn_us": turn_times[int(0.99 * (len(turn_times) - 1))] * 1e6,
+        "peak_memory_kb": peak_memory / 1024,
+        "game_memory_kb": game_memory / 1024,
+        "mean_score": sum(scores) / len(scores),
+    }
+
+
+def find_regressions(baseline_results, results, threshold):
+    """Returns (config, metric, ratio) for every metric more than threshold times
+    worse than in the baseline. Configurations missing from either side are skipped"""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline_results:
+            continue
+        old = baseline_results[name]
+        ratios = {
+            "games_per_sec": old["games_per_sec"] / result["games_per_sec"],
+            "p99_turn_us": result["p99_turn_us"] / old["p99_turn_us"],
+            "peak_memory_kb": result["peak_memory_kb"] / old["peak_memory_kb"],
+        }
+        for metric, ratio in ratios.items():
+            if ratio > threshold:
+                regressions.append((name, metric, ratio))
+    return regressions
+
+
+def format_benchmarks(results, regressions=()):
+    regressed = {name for name, _, _ in regressions}
+    return tabulate(
+        [
+            [
+                name + (" *" if name in regressed else ""),
+                round(r["games_per_sec"], 1),
+                round(r["mean_turn_us"], 1),
+                round(r["p99_turn_us"], 1),
+                round(r["peak_memory_kb"], 1),
+                round(r["game_memory_kb"], 1),
+                round(r["mean_score"], 2),
+            ]
+            for name, r in results.items()
+        ],
+        headers=[
+            "Configuration",
+            "Games/sec",
+            "Mean turn (us)",
+            "P99 turn (us)",
+            "Peak memory (KB)",
+            "Game memory (KB)",
+            "Mean score",
+        ],
+        tablefmt="pretty",
+    )
+
+
+if __name__ == "__main__":
+    run_benchmarks()
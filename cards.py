@@ -11,6 +11,8 @@ class Suit(Enum):
 
 
 class Card:
+    __slots__ = ("suit", "number", "game", "hinted_suit", "hinted_number")
+
     def __init__(self, suit, number, game):
         self.suit = suit
         self.number = number
@@ -21,6 +23,13 @@ class Card:
     def __repr__(self):
         return "{} {}".format(self.suit, self.number)
 
+    def copy(self, game):
+        """Copy of the card, with its hint knowledge, belonging to game"""
+        card = Card(self.suit, self.number, game)
+        card.hinted_suit = self.hinted_suit
+        card.hinted_number = self.hinted_number
+        return card
+
     def match_hint(self, hint):
         if hint.type == Hint.TYPE_SUIT:
             return self.suit == hint.value
@@ -29,17 +38,19 @@ class Card:
 
     def apply_hint(self, hint):
         if hint.type == Hint.TYPE_SUIT and self.suit == hint.value:
-            self.game.assert_(
-                (self.hinted_suit is None) or (self.hinted_suit == hint.value)
-            )
+            if self.game.check_invariants:
+                self.game.assert_(
+                    (self.hinted_suit is None) or (self.hinted_suit == hint.value)
+                )
             self.hinted_suit = hint.value
             return True
 
         if hint.type == Hint.TYPE_NUMBER and self.number == hint.value:
-            self.game.assert_(
-                (self.hinted_number is None) or (self.hinted_number == hint.value)
-            )
-            self.game.assert_(hint.value == self.number)
+            if self.game.check_invariants:
+                self.game.assert_(
+                    (self.hinted_number is None) or (self.hinted_number == hint.value)
+                )
+                self.game.assert_(hint.value == self.number)
             self.hinted_number = hint.value
             return True
 
@@ -50,6 +61,8 @@ class Hint:
     TYPE_SUIT = "TYPE_SUIT"
     TYPE_NUMBER = "TYPE_NUMBER"
 
+    __slots__ = ("player", "type", "value", "game", "target_card", "purpose")
+
     def __repr__(self):
         return "To {}: {} {} {} | Targeting {}".format(
             self.player.player_number,
@@ -60,7 +73,8 @@ class Hint:
         )
 
     def __init__(self, player, type, value, game, target_card=None, purpose=None):
-        game.assert_(type == Hint.TYPE_SUIT or type == Hint.TYPE_NUMBER)
+        if game.check_invariants:
+            game.assert_(type == Hint.TYPE_SUIT or type == Hint.TYPE_NUMBER)
 
         self.player = player
         self.type = type
@@ -68,3 +82,88 @@ class Hint:
         self.game = game
         self.target_card = target_card
         self.purpose = purpose
+
+
+# Compact encoding used by CompactGame: a card is the int suit_index * 5 + number - 1
+SUITS = list(Suit)
+SUIT_INDEXES = {s: i for i, s in enumerate(SUITS)}
+CARD_SUITS = tuple(s for s in SUITS for _ in range(5))
+CARD_NUMBERS = tuple(n for _ in SUITS for n in range(1, 6))
+
+# Same card order as Game.init_deck, so a seed shuffles to the same deck in every engine
+SUIT_DECK_NUMBERS = [1, 1, 1, 2, 3, 4, 2, 3, 4, 5]
+
+KNOWS_SUIT = 1
+KNOWS_NUMBER = 2
+
+
+def encode_card(suit, number):
+    return SUIT_INDEXES[suit] * 5 + number - 1
+
+
+class CompactCard:
+    """Adapter that lets players use int-encoded cards like a Card. It is only created
+    when a card is drawn into a hand, and its hint knowledge is a bitmask"""
+
+    __slots__ = ("code", "suit", "number", "game", "knowledge")
+
+    def __init__(self, code, game):
+        self.code = code
+        # Decoded once here, since players read suit and number far more than hints
+        self.suit = CARD_SUITS[code]
+        self.number = CARD_NUMBERS[code]
+        self.game = game
+        self.knowledge = 0
+
+    def __repr__(self):
+        return "{} {}".format(self.suit, self.number)
+
+    def copy(self, game):
+        card = CompactCard(self.code, game)
+        card.knowledge = self.knowledge
+        return card
+
+    @property
+    def hinted_suit(self):
+        return self.suit if self.knowledge & KNOWS_SUIT else None
+
+    @hinted_suit.setter
+    def hinted_suit(self, suit):
+        if suit is None:
+            self.knowledge &= ~KNOWS_SUIT
+        else:
+            # Knowledge is a single bit, so it can only record the card's real suit
+            if self.game.check_invariants:
+                self.game.assert_(suit == self.suit)
+            self.knowledge |= KNOWS_SUIT
+
+    @property
+    def hinted_number(self):
+        return self.number if self.knowledge & KNOWS_NUMBER else None
+
+    @hinted_number.setter
+    def hinted_number(self, number):
+        if number is None:
+            self.knowledge &= ~KNOWS_NUMBER
+        else:
+            if self.game.check_invariants:
+                self.game.assert_(number == self.number)
+            self.knowledge |= KNOWS_NUMBER
+
+    def match_hint(self, hint):
+        if hint.type == Hint.TYPE_SUIT:
+            return self.suit == hint.value
+        elif hint.type == Hint.TYPE_NUMBER:
+            return self.number == hint.value
+
+    def apply_hint(self, hint):
+        # Hints are always true, so a matching hint never contradicts the knowledge
+        if hint.type == Hint.TYPE_SUIT and self.suit == hint.value:
+            self.knowledge |= KNOWS_SUIT
+            return True
+
+        if hint.type == Hint.TYPE_NUMBER and self.number == hint.value:
+            self.knowledge |= KNOWS_NUMBER
+            return True
+
+        return False
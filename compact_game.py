@@ -0,0 +1,99 @@
+from array import array
+
+from cards import (
+    CARD_NUMBERS,
+    CARD_SUITS,
+    SUIT_DECK_NUMBERS,
+    SUIT_INDEXES,
+    CompactCard,
+    encode_card,
+)
+from events import EVENT_DRAW
+from game import Game
+
+# Shared read-only cards, used to show players the cards still in the deck
+CARD_FACES = tuple(CompactCard(code, None) for code in range(len(CARD_SUITS)))
+
+
+class CompactGame(Game):
+    """Game engine where cards are ints (see cards.encode_card), the deck is a byte
+    array and played numbers are an array indexed by suit.
+
+    Players see cards through CompactCard, which is only created when a card is
+    drawn, so existing strategies work unchanged. A seed gives the same game as Game.
+    """
+
+    def init_played_numbers(self):
+        self.played_numbers = array("b", [0] * len(self.suits))
+
+    def reset_played_numbers(self):
+        for suit_index in range(len(self.suits)):
+            self.played_numbers[suit_index] = 0
+
+    def init_deck(self, deck_codes=None):
+        if deck_codes is not None:
+            self.deck = array("B", deck_codes)
+            self._remaining_card_list = None
+            return
+
+        deck = array("B")
+        for suit_index in range(len(self.suits)):
+            deck.extend(suit_index * 5 + n - 1 for n in SUIT_DECK_NUMBERS)
+        self.rng.shuffle(deck)
+
+        self.deck = deck
+        self._remaining_card_list = None
+
+    def reset_deck(self, deck_codes=None):
+        # Nothing to reuse, since cards only become objects when they are drawn
+        self.init_deck(deck_codes)
+
+    def draw(self, player):
+        if self.deck:
+            card = CompactCard(self.deck.pop(), self)
+            player.add_card(card)
+            self.events.publish(EVENT_DRAW, player, card)
+        else:
+            player.add_card(None)
+
+    def is_card_playable(self, card):
+        return self.played_numbers[card.code // 5] == card.code % 5
+
+    def advance_played_number(self, card):
+        self.played_numbers[card.code // 5] += 1
+        self.advance_needed_number(card.suit, card.number)
+
+    def get_played_number(self, suit):
+        return self.played_numbers[SUIT_INDEXES[suit]]
+
+    def remove_remaining_card(self, card):
+        self._remaining_counts[card.suit][card.number] -= 1
+        self._card_possibilities.remove_card(card.suit, card.number)
+        self._remaining_card_list = None
+
+    def fork_remaining_card_list(self, game, cards):
+        self._remaining_card_list = None
+
+    def get_deck_values(self):
+        return [(CARD_SUITS[code], CARD_NUMBERS[code]) for code in self.deck]
+
+    def set_deck_values(self, values):
+        self.deck = array("B", (encode_card(suit, n) for suit, n in values))
+
+    def set_card_value(self, card, suit, number):
+        card.code = encode_card(suit, number)
+        card.suit = suit
+        card.number = number
+
+    def get_remaining_card_list(self):
+        """Read-only list of the cards that have not been played or discarded yet.
+        Deck cards are shown as shared faces, and the list is only rebuilt after a
+        card leaves the game"""
+        if self._remaining_card_list is None:
+            self._remaining_card_list = tuple(
+                CARD_FACES[suit_index * 5 + number - 1]
+                for suit_index, suit in enumerate(self.suits)
+                for number, count in self._remaining_counts[suit].items()
+                for _ in range(count)
+            )
+        return self._remaining_card_list
@@ -0,0 +1,97 @@
+#!/usr/bin/python
+from functools import lru_cache
+import mmap
+import random
+import struct
+
+import click
+import numpy as np
+
+from cards import SUIT_DECK_NUMBERS
+from seeding import derive_seed
+
+MAGIC = b"HNBDECK1"
+# Magic, master seed, number of decks
+HEADER = struct.Struct("<8sQQ")
+
+
+@click.command()
+@click.argument("output", type=click.Path(dir_okay=False))
+@click.option("--games", "-g", "num_games", type=click.INT, required=True)
+@click.option("--master-seed", type=click.INT, default=0)
+def create_corpus(output, num_games, master_seed):
+    """Writes the decks of the first --games games of --master-seed, with and without
+    rainbow, as a corpus that main.py --deck-corpus deals from"""
+    write_corpus(output, master_seed, num_games)
+
+
+def deck_codes(seed, use_rainbow):
+    """Card codes (see cards.encode_card) of the deck Game shuffles for seed, in the
+    same order as Game.deck, whose last card is drawn first"""
+    deck = [
+        suit_index * 5 + n - 1
+        for suit_index in range(6 if use_rainbow else 5)
+        for n in SUIT_DECK_NUMBERS
+    ]
+    random.Random(seed).shuffle(deck)
+    return deck
+
+
+def write_corpus(path, master_seed, num_games):
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, master_seed, num_games))
+        for use_rainbow in (False, True):
+            for i in range(num_games):
+                f.write(bytes(deck_codes(derive_seed(master_seed, i), use_rainbow)))
+
+
+class DeckCorpus:
+    """Read-only, memory-mapped corpus of decks written by write_corpus.
+
+    Deck i belongs to the game with seed derive_seed(master_seed, i), and is 50 (or
+    60 with rainbow) bytes of card codes. Every process that opens the file shares
+    the same page-cached copy, and decks are handed out as views, without copying.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.master_seed, self.count = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError("{} is not a deck corpus".format(path))
+        self.view = memoryview(self.data)
+
+    def get_seed(self, index):
+        return derive_seed(self.master_seed, index)
+
+    def get_offset(self, index, use_rainbow):
+        offset = HEADER.size + (self.count * 50 if use_rainbow else 0)
+        return offset + index * self.get_deck_size(use_rainbow)
+
+    def get_deck_size(self, use_rainbow):
+        return 60 if use_rainbow else 50
+
+    def get_deck(self, index, use_rainbow):
+        """Memoryview of the card codes of deck index"""
+        offset = self.get_offset(index, use_rainbow)
+        return self.view[offset : offset + self.get_deck_size(use_rainbow)]
+
+    def get_decks(self, start, stop, use_rainbow):
+        """Read-only numpy view of decks [start, stop), one row per deck"""
+        deck_size = self.get_deck_size(use_rainbow)
+        return np.frombuffer(
+            self.data,
+            np.int8,
+            (stop - start) * deck_size,
+            self.get_offset(start, use_rainbow),
+        ).reshape(stop - start, deck_size)
+
+
+@lru_cache(maxsize=None)
+def load_corpus(path):
+    """The process's one DeckCorpus for path"""
+    return DeckCorpus(path)
+
+
+if __name__ == "__main__":
+    create_corpus()
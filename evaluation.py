@@ -0,0 +1,190 @@
+from collections import defaultdict
+from math import sqrt
+
+from game import Game
+from seeding import derive_seed
+
+
+class WeightEvaluator:
+    """Scores strategy weight vectors on a pool of worker processes.
+
+    Every candidate plays the same seeds (common random numbers), so differences
+    between candidates come from the weights rather than the decks. Scores are
+    memoized per weight vector for the lifetime of the evaluator (and across runs
+    with a result_store.ResultStore), and seeds are played in rounds so a candidate
+    can be dropped as soon as it is clearly worse than the incumbent on the seeds
+    played so far.
+    """
+
+    def __init__(
+        self,
+        pool,
+        trials,
+        strategy="INFO",
+        num_players=3,
+        use_rainbow=False,
+        master_seed=0,
+        round_size=100,
+        task_size=25,
+        confidence_z=3.0,
+        store=None,
+    ):
+        self.pool = pool
+        self.trials = trials
+        self.strategy = strategy
+        self.num_players = num_players
+        self.use_rainbow = use_rainbow
+        self.round_size = round_size
+        self.task_size = task_size
+        self.confidence_z = confidence_z
+        self.store = store
+        self.seeds = [derive_seed(master_seed, i) for i in range(trials)]
+        # Weights key -> scores on the first len(scores) seeds
+        self.scores = {}
+
+    def evaluate(self, candidates, incumbent=None, trials=None):
+        """Returns (mean score, complete) for each candidate, over the first `trials`
+        seeds (all of them by default). If an incumbent is given, it is fully
+        evaluated first, and candidates that are clearly worse stop early with
+        complete set to False."""
+        budget = trials or self.trials
+        incumbent_key = None
+        if incumbent is not None:
+            incumbent_key = weights_key(incumbent)
+            self.play_rounds([incumbent_key], budget)
+
+        keys = [weights_key(w) for w in candidates]
+        self.play_rounds(
+            list(dict.fromkeys(keys)),
+            budget,
+            lambda k: incumbent_key is not None
+            and k != incumbent_key
+            and self.is_clearly_worse(k, incumbent_key, budget),
+        )
+        return [(self.mean(k, budget), len(self.scores[k]) >= budget) for k in keys]
+
+    def race(self, candidates):
+        """Plays every candidate round by round, dropping the ones that are clearly
+        worse than the current leader. Returns (mean score, survived) for each."""
+        keys = [weights_key(w) for w in candidates]
+        alive = list(dict.fromkeys(keys))
+        budget = 0
+        while budget < self.trials and len(alive) > 1:
+            budget = min(budget + self.round_size, self.trials)
+            self.play_rounds(alive, budget)
+            leader = max(alive, key=lambda k: self.mean(k, budget))
+            alive = [
+                k
+                for k in alive
+                if k == leader or not self.is_clearly_worse(k, leader, budget)
+            ]
+        # Survivors get every seed, including a lone candidate the loop never played
+        self.play_rounds(alive, self.trials)
+        return [(self.mean(k, self.trials), k in alive) for k in keys]
+
+    def mean(self, key, budget):
+        scores = self.scores[key][:budget]
+        return sum(scores) / len(scores)
+
+    def play_rounds(self, keys, budget, should_stop=None):
+        """Plays seeds for every key until it has `budget` scores or should_stop"""
+        for k in keys:
+            self.scores.setdefault(k, [])
+            if self.store:
+                self.load_stored(k, budget)
+
+        def is_settled(k):
+            return len(self.scores[k]) >= budget or (should_stop and should_stop(k))
+
+        remaining = [k for k in keys if not is_settled(k)]
+        while remaining:
+            # Every remaining candidate's next round goes to the pool at once
+            tasks = []
+            for k in remaining:
+                start = len(self.scores[k])
+                stop = min(start + self.round_size, budget)
+                for task_start in range(start, stop, self.task_size):
+                    task_seeds = self.seeds[
+                        task_start : min(task_start + self.task_size, stop)
+                    ]
+                    tasks.append(
+                        (
+                            k,
+                            self.pool.apply_async(
+                                play_seeds,
+                                (
+                                    (
+                                        self.strategy,
+                                        self.num_players,
+                                        self.use_rainbow,
+                                        defaultdict(float, k),
+                                        task_seeds,
+                                    ),
+                                ),
+                            ),
+                        )
+                    )
+            # Tasks are collected in submission order, so scores line up with seeds
+            for k, result in tasks:
+                outcomes = result.get()
+                self.scores[k] += [score for _, score, _, _ in outcomes]
+                if self.store:
+                    self.store.save(self.config_key(k), outcomes)
+
+            remaining = [k for k in remaining if not is_settled(k)]
+
+    def config_key(self, key):
+        return self.store.config_key(
+            Game, self.strategy, self.num_players, self.use_rainbow, dict(key)
+        )
+
+    def load_stored(self, key, budget):
+        """Extends key's scores with stored outcomes, up to the first seed that has
+        none, so scores keep lining up with seeds"""
+        scores = self.scores[key]
+        seeds = self.seeds[len(scores) : budget]
+        stored = self.store.load(self.config_key(key), seeds)
+        for seed in seeds:
+            if seed not in stored:
+                break
+            scores.append(stored[seed][0])
+
+    def is_clearly_worse(self, key, other_key, budget):
+        """Whether the upper confidence bound of the paired score difference against
+        other_key, over the seeds both have played, is below zero"""
+        diffs = [
+            s - o for s, o in zip(self.scores[key][:budget], self.scores[other_key])
+        ]
+        n = len(diffs)
+        if n < self.round_size:
+            return False
+
+        mean_diff = sum(diffs) / n
+        variance = sum((d - mean_diff) ** 2 for d in diffs) / (n - 1)
+        return mean_diff + self.confidence_z * sqrt(variance / n) < 0
+
+
+def weights_key(weights):
+    return tuple(sorted(weights.items()))
+
+
+def play_seeds(args):
+    """Pool entry point: plays one game per seed and returns (seed, score, wasted
+    discards, turns) for each"""
+    strategy, num_players, use_rainbow, weights, seeds = args
+    outcomes = []
+    g = None
+    for seed in seeds:
+        if g is None:
+            g = Game(
+                num_players,
+                strategy,
+                use_rainbow,
+                should_print=False,
+                seed=seed,
+                weights=weights,
+            )
+        else:
+            g.reset(seed)
+        outcomes.append((seed, g.run_game(), g.wasted_discards, g.current_turn))
+    return outcomes
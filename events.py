@@ -0,0 +1,37 @@
+"""Events Game publishes as the game changes, with the arguments handlers get"""
+
+# (player, card): a card was added to player's hand
+EVENT_DRAW = 0
+# (card): a card was played successfully, after the suit advanced
+EVENT_PLAY = 1
+# (card): a card was played but wasn't playable
+EVENT_MISPLAY = 2
+# (card): a card was discarded
+EVENT_DISCARD = 3
+# (hint): a hint was given, after the hinted player received it
+EVENT_HINT = 4
+# (suit): the suit's 5 was played, before EVENT_PLAY for it
+EVENT_SUIT_COMPLETED = 5
+
+NUM_EVENTS = 6
+
+
+class EventBus:
+    """Calls the handlers subscribed to an event whenever Game publishes it.
+
+    Strategies subscribe in Player.subscribe and keep their own indexes up to date
+    from the events, instead of recomputing them from the game every turn. Handlers
+    are kept in a list per event, so publishing an event nobody listens to costs a
+    call and a list lookup."""
+
+    __slots__ = ("handlers",)
+
+    def __init__(self):
+        self.handlers = [[] for _ in range(NUM_EVENTS)]
+
+    def subscribe(self, event, handler):
+        self.handlers[event].append(handler)
+
+    def publish(self, event, *args):
+        for handler in self.handlers[event]:
+            handler(*args)
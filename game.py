@@ -1,15 +1,36 @@
 from collections import defaultdict
+import copy
 import random
 import sys
+from types import MappingProxyType
 
 import click
 
-from cards import Card, Suit
+from cards import CARD_NUMBERS, CARD_SUITS, SUIT_DECK_NUMBERS, Card, Suit
+from events import (
+    EVENT_DISCARD,
+    EVENT_DRAW,
+    EVENT_HINT,
+    EVENT_MISPLAY,
+    EVENT_PLAY,
+    EVENT_SUIT_COMPLETED,
+    EventBus,
+)
+from game_trace import ACTION_DISCARD, ACTION_MISPLAY, ACTION_PLAY
 from players import STRATEGIES
+from possibilities import CardPossibilityIndex
+from validation import (
+    VALIDATION_CHEAP,
+    VALIDATION_FULL,
+    VALIDATION_OFF,
+    check_game_state,
+    is_sampled,
+)
 
 
 class Game:
     MAX_NUMBER = 5
+    NUMBER_COUNTS = {1: 3, 2: 2, 3: 2, 4: 2, 5: 1}
 
     def __init__(
         self,
@@ -20,6 +41,10 @@ class Game:
         log_file=None,
         seed=None,
         weights=None,
+        trace=None,
+        deck_codes=None,
+        validation=VALIDATION_CHEAP,
+        validation_sample=1,
     ):
         self.num_players = num_players
         self.strategy = strategy
@@ -27,45 +52,149 @@ class Game:
         self.should_print = should_print
         self.log_file = log_file
         self.should_log = self.should_print or self.log_file
+        self.trace = trace
         self.suits = [s for s in Suit if self.use_rainbow or s != Suit.RAINBOW]
         self.weights = weights
+        self.validation = validation
+        self.validation_sample = validation_sample
+        # Hot code checks this before calling assert_, so checks cost nothing when off
+        self.check_invariants = validation != VALIDATION_OFF
+        # Checks that compare whole hands or build sets only run at the full level
+        self.check_expensive = validation == VALIDATION_FULL
+
+        self.init_seed(seed)
+        self.init_counters()
+        self.init_played_numbers()
+        self.init_derived_state()
+        self.discarded_cards = []
+        self.events = EventBus()
+        self.init_players(self.num_players, self.strategy)
+        self.init_deck(deck_codes)
+        self.deal()
+
+    def reset(self, seed=None, deck_codes=None):
+        """Starts a new game with the same players and options, reusing the game's
+        objects (players, cards and state) instead of building new ones. It plays the
+        same game as a new Game with seed and deck_codes. Forks of the last game are
+        unaffected: cards that have been forked are replaced rather than reused"""
+        self.init_seed(seed)
+        self.init_counters()
+        self.reset_played_numbers()
+        self.reset_derived_state()
+        self.discarded_cards.clear()
+        for p in self.players:
+            p.reset()
+        self.reset_deck(deck_codes)
+        self.deal()
 
-        self.fatal_discards = 0
-
+    def init_seed(self, seed):
         if seed:
             self.seed = seed
         else:
-            random.seed()
-            self.seed = random.randint(0, sys.maxsize - 1)
-        random.seed(self.seed)
+            self.seed = random.Random().randint(0, sys.maxsize - 1)
+        # Every game has its own generator, so games can run side by side in a process
+        self.rng = random.Random(self.seed)
+        self.check_state = self.validation == VALIDATION_FULL and is_sampled(
+            self.seed, self.validation_sample
+        )
 
+    def init_counters(self):
         self.current_turn = 0
-        self.turn_timer = num_players
+        self.current_player = 0
+        self.turn_timer = self.num_players
         self.hints = 8
         self.fails = 0
         self.wasted_discards = 0
+        self.fatal_discards = 0
 
-        self.played_numbers = {}
-        for suit in self.suits:
-            self.played_numbers[suit] = 0
-        self.discarded_cards = []
-
-        self.init_players(self.num_players, self.strategy)
-        self.current_player = 0
-
-        self.init_deck()
-
+    def deal(self):
         for p in self.players:
-            for i in range(5 if num_players < 4 else 4):
-                p.add_card(self.deck.pop())
+            for i in range(5 if self.num_players < 4 else 4):
+                self.draw(p)
 
     def init_players(self, num_players, strategy):
         self.players = []
         for i in range(num_players):
             self.assert_(strategy in STRATEGIES)
             self.players.append(STRATEGIES[strategy](self, i, self.weights))
+        for p in self.players:
+            p.subscribe(self.events)
+
+    def init_played_numbers(self):
+        self.played_numbers = {}
+        for suit in self.suits:
+            self.played_numbers[suit] = 0
+
+    def reset_played_numbers(self):
+        for suit in self.suits:
+            self.played_numbers[suit] = 0
+
+    def init_derived_state(self):
+        """Score, needed numbers and remaining cards are kept up to date as cards are
+        played and discarded, and players get read-only views of them"""
+        self._score = 0
+        self._needed_numbers = {s: 1 for s in self.suits}
+        self._remaining_counts = {s: self.NUMBER_COUNTS.copy() for s in self.suits}
+        self.init_views()
+        self._card_possibilities = CardPossibilityIndex.for_new_game(
+            self.suits, self.NUMBER_COUNTS
+        )
+
+    def reset_derived_state(self):
+        """init_derived_state for Game.reset, refilling the dicts in place so the views
+        players hold stay valid"""
+        self._score = 0
+        self._needed_numbers.clear()
+        for suit in self.suits:
+            self._needed_numbers[suit] = 1
+            self._remaining_counts[suit].update(self.NUMBER_COUNTS)
+        self._card_possibilities = CardPossibilityIndex.for_new_game(
+            self.suits, self.NUMBER_COUNTS
+        )
+
+    def init_views(self):
+        self._needed_numbers_view = MappingProxyType(self._needed_numbers)
+        self._remaining_cards_view = MappingProxyType(
+            {s: MappingProxyType(c) for s, c in self._remaining_counts.items()}
+        )
+
+    def fork_derived_state(self, game):
+        """Copies the derived state of game, which is being forked into self"""
+        self._needed_numbers = game._needed_numbers.copy()
+        self._remaining_counts = {
+            s: c.copy() for s, c in game._remaining_counts.items()
+        }
+        self.init_views()
+        self._card_possibilities = game._card_possibilities.copy()
+
+    def fork_remaining_card_list(self, game, cards):
+        # Order isn't preserved: copied cards, and cards the fork draws, move to the end
+        self._remaining_card_list = game._remaining_card_list.copy()
+        for card, card_copy in cards.items():
+            del self._remaining_card_list[card]
+            self._remaining_card_list[card_copy] = None
+
+    def __getstate__(self):
+        # Views can't be pickled, so a game sent to another process rebuilds them
+        state = self.__dict__.copy()
+        del state["_needed_numbers_view"]
+        del state["_remaining_cards_view"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.init_views()
+
+    def init_deck(self, deck_codes=None):
+        """Shuffles a new deck with the game's rng, or deals deck_codes (card codes in
+        the order of self.deck, e.g. from deck_corpus.DeckCorpus) if given"""
+        if deck_codes is not None:
+            self.deck = [Card(CARD_SUITS[c], CARD_NUMBERS[c], self) for c in deck_codes]
+            self._remaining_card_list = dict.fromkeys(self.deck)
+            self._cards = self.deck.copy()
+            self._cards_shared = False
+            return
 
-    def init_deck(self):
         deck = []
         for suit in self.suits:
             for i in range(3):
@@ -75,85 +204,241 @@ class Game:
                 deck.append(Card(suit, 3, self))
                 deck.append(Card(suit, 4, self))
             deck.append(Card(suit, 5, self))
-        random.shuffle(deck)
+        self.rng.shuffle(deck)
 
         self.deck = deck
+        # Insertion-ordered dict used as a set, so cards can leave the game in O(1)
+        self._remaining_card_list = dict.fromkeys(deck)
+        # Every card of the game, which reset_deck deals again unless a fork shares them
+        self._cards = deck.copy()
+        self._cards_shared = False
+
+    def reset_deck(self, deck_codes=None):
+        """Deals the deck init_deck would, by giving the last game's cards new values.
+        Cards a fork may still hold (see fork) are left alone, and new ones are made"""
+        if self._cards_shared:
+            self.init_deck(deck_codes)
+            return
+
+        if deck_codes is None:
+            deck_codes = [
+                suit_index * 5 + n - 1
+                for suit_index in range(len(self.suits))
+                for n in SUIT_DECK_NUMBERS
+            ]
+            self.rng.shuffle(deck_codes)
+
+        for card, code in zip(self._cards, deck_codes):
+            card.suit = CARD_SUITS[code]
+            card.number = CARD_NUMBERS[code]
+            card.hinted_suit = None
+            card.hinted_number = None
+        self.deck = self._cards.copy()
+        self._remaining_card_list = dict.fromkeys(self.deck)
 
     def advance_player(self):
         next_player = self.current_player + 1
         self.current_player = next_player if next_player < self.num_players else 0
 
     def draw(self, player):
-        player.add_card(self.deck.pop() if self.deck else None)
+        card = self.deck.pop() if self.deck else None
+        if card and card.game is not self:
+            card = self.adopt_card(card)
+        player.add_card(card)
+        if card:
+            self.events.publish(EVENT_DRAW, player, card)
+
+    def adopt_card(self, card):
+        """Forks share their deck's cards with the original game until they are drawn.
+        This makes the fork's own card, with the knowledge of an undrawn card: the
+        original may have drawn and hinted the shared card since the fork"""
+        card_copy = Card(card.suit, card.number, self)
+        del self._remaining_card_list[card]
+        self._remaining_card_list[card_copy] = None
+        return card_copy
+
+    def fork(self, seed=None):
+        """Independent copy of the game for lookahead, reshuffling its deck if given a
+        seed. Flags both games' cards as shared, so neither reuses them on reset"""
+        # Immutable parts, like the cards left in the deck, are shared
+        game = object.__new__(type(self))
+        game.__dict__.update(self.__dict__)
+        game.should_print = False
+        game.log_file = None
+        game.should_log = None
+        game.trace = None
+        game.rng = None
+        game.events = EventBus()
+        game.check_state = False
+        game._cards_shared = True
+        self._cards_shared = True
+
+        game.played_numbers = copy.copy(self.played_numbers)
+        game.fork_derived_state(self)
+        game.discarded_cards = self.discarded_cards.copy()
+        game.deck = copy.copy(self.deck)
+
+        cards = {}
+        for p in self.players:
+            for c in p.get_hand():
+                cards[c] = c.copy(game)
+        game.fork_remaining_card_list(self, cards)
+
+        game.players = [p.fork(game, cards) for p in self.players]
+        for p in game.players:
+            p.subscribe(game.events)
+
+        if seed:
+            game.seed = seed
+            game.rng = random.Random(seed)
+            game.rng.shuffle(game.deck)
+        return game
+
+    def redeal_hidden_cards(self, player, rng, could_be=None):
+        """Determinizes the game from player's point of view: the cards player can't
+        see (its own hand and the deck) are dealt again at random with rng, so that
+        each card in the hand still matches its hint knowledge. Meant for forks.
+
+        Returns False, leaving the game unchanged, if the deal ran out of cards
+        matching some card's knowledge. Cards that know more are dealt first, which
+        makes that rare."""
+        hand = list(player.get_hand())
+        values = [(c.suit, c.number) for c in hand] + self.get_deck_values()
+        rng.shuffle(values)
+
+        hand_values = {}
+        for card in sorted(
+            hand, key=lambda c: (c.hinted_suit is None) + (c.hinted_number is None)
+        ):
+            hinted_suit = card.hinted_suit
+            hinted_number = card.hinted_number
+            for i, (suit, number) in enumerate(values):
+                if (
+                    (hinted_suit is None or hinted_suit == suit)
+                    and (hinted_number is None or hinted_number == number)
+                    and (could_be is None or could_be(card, suit, number))
+                ):
+                    hand_values[card] = values.pop(i)
+                    break
+            else:
+                return False
+
+        for card, (suit, number) in hand_values.items():
+            self.set_card_value(card, suit, number)
+        self.set_deck_values(values)
+        return True
+
+    def get_deck_values(self):
+        return [(c.suit, c.number) for c in self.deck]
+
+    def set_deck_values(self, values):
+        """Replaces the deck with new cards of values, drawn from the end"""
+        for card in self.deck:
+            del self._remaining_card_list[card]
+        self.deck = [Card(suit, number, self) for suit, number in values]
+        self._remaining_card_list.update(dict.fromkeys(self.deck))
+
+    def set_card_value(self, card, suit, number):
+        card.suit = suit
+        card.number = number
 
     def is_card_playable(self, card):
         return self.played_numbers[card.suit] == card.number - 1
 
     def play_card(self, card):
+        self.remove_remaining_card(card)
         if self.is_card_playable(card):
-            self.played_numbers[card.suit] += 1
+            self.advance_played_number(card)
             if card.number == 5:
                 self.increment_hints()
-            self.log_string("Successfully played {}".format(card))
+            self.log("Successfully played {}", card)
+            if self.trace:
+                self.trace.record_card(
+                    self.current_turn, self.current_player, ACTION_PLAY, card
+                )
+            self.events.publish(EVENT_PLAY, card)
         else:
             self.fails += 1
-            self.log_string("Failed to play {}".format(card))
+            self.log("Failed to play {}", card)
+            if self.trace:
+                self.trace.record_card(
+                    self.current_turn, self.current_player, ACTION_MISPLAY, card
+                )
+            self.events.publish(EVENT_MISPLAY, card)
 
     def discard_card(self, card):
-        self.log_string("Discarded {}".format(card))
+        self.log("Discarded {}", card)
+        if self.trace:
+            self.trace.record_card(
+                self.current_turn, self.current_player, ACTION_DISCARD, card
+            )
         if self.hints == 8:
             self.wasted_discards += 1
 
+        self.remove_remaining_card(card)
         self.discarded_cards.append(card)
         self.increment_hints()
+        self.events.publish(EVENT_DISCARD, card)
+
+    def advance_played_number(self, card):
+        self.played_numbers[card.suit] += 1
+        self.advance_needed_number(card.suit, card.number)
+
+    def advance_needed_number(self, suit, played_number):
+        self._score += 1
+        self._card_possibilities.advance_suit(suit, played_number)
+        if played_number == 5:
+            del self._needed_numbers[suit]
+            self.events.publish(EVENT_SUIT_COMPLETED, suit)
+        else:
+            self._needed_numbers[suit] = played_number + 1
+
+    def remove_remaining_card(self, card):
+        """Called when a card leaves the game by being played or discarded"""
+        del self._remaining_card_list[card]
+        self._remaining_counts[card.suit][card.number] -= 1
+        self._card_possibilities.remove_card(card.suit, card.number)
 
     def give_hint(self, hint):
-        self.log_string(
-            "{} hint to player {}: {}".format(
-                hint.type, hint.player.player_number, hint.value
-            )
+        self.log(
+            "{} hint to player {}: {}", hint.type, hint.player.player_number, hint.value
         )
+        if self.trace:
+            self.trace.record_hint(self.current_turn, self.current_player, hint)
         hint.player.receive_hint(hint)
         self.decrement_hints()
+        self.events.publish(EVENT_HINT, hint)
 
     def increment_hints(self):
         if self.hints < 8:
             self.hints += 1
 
     def decrement_hints(self):
-        self.assert_(self.hints > 0)
+        if self.check_invariants:
+            self.assert_(self.hints > 0)
         self.hints -= 1
 
+    def get_played_number(self, suit):
+        return self.played_numbers[suit]
+
     def get_score(self):
-        score = 0
-        for s in self.suits:
-            score += self.played_numbers[s]
-        return score
+        return self._score
 
     def get_needed_numbers(self):
-        needed_numbers = {}
-        for s in self.suits:
-            if self.played_numbers[s] == 5:
-                continue
-            needed_numbers[s] = self.played_numbers[s] + 1
-        return needed_numbers
+        """Read-only view of the next number needed for each unfinished suit"""
+        return self._needed_numbers_view
 
     def get_remaining_card_list(self):
-        remaining_card_list = self.deck.copy()
-
-        for p in self.players:
-            remaining_card_list += p.get_hand()
-
-        return remaining_card_list
+        """Read-only view of the cards that have not been played or discarded yet"""
+        return self._remaining_card_list.keys()
 
     def get_remaining_cards(self):
-        remaining_card_list = self.get_remaining_card_list()
-        remaining_cards = {}
-        for s in self.suits:
-            remaining_cards[s] = defaultdict(int)
+        """Read-only view of how many copies of each suit and number are left"""
+        return self._remaining_cards_view
 
-        for c in remaining_card_list:
-            remaining_cards[c.suit][c.number] += 1
+    def get_card_possibilities(self):
+        """possibilities.CardPossibilityIndex of the cards that have not left the game"""
+        return self._card_possibilities
 
     def get_endangered_cards(self):
         remaining_cards = self.get_remaining_cards()
@@ -171,45 +456,43 @@ class Game:
         return endangered_cards
 
     def run_turn(self, player, turn_number):
-        self.log_string(
+        self.log(
             """
 ==============================
             Turn {}
 ==============================
-""".format(
-                turn_number
-            )
+""",
+            turn_number,
         )
         if self.should_log:  # Check this early b/c repr_global_state is expensive
             self.log_string(self.repr_global_state())
         player.take_turn()
 
     def run_game(self):
-        self.log_string(
+        self.log(
             """
 ============================================================
                         Starting game
                  Seed {} | {} Player | {} {}
 ============================================================
-        """.format(
-                self.seed,
-                self.num_players,
-                self.strategy,
-                "with rainbow" if self.use_rainbow else "no rainbow",
-            )
+        """,
+            self.seed,
+            self.num_players,
+            self.strategy,
+            "with rainbow" if self.use_rainbow else "no rainbow",
         )
 
         while (
             self.fails < 3
             and self.turn_timer >= 0
-            and sum(self.played_numbers.values()) < 5 * len(self.suits)
+            and self.get_score() < 5 * len(self.suits)
         ):
+            if self.check_state:
+                check_game_state(self)
             self.run_turn(self.players[self.current_player], self.current_turn)
-            if not self.deck:
-                self.turn_timer -= 1
-
-            self.advance_player()
-            self.current_turn += 1
+            self.end_turn()
+        if self.check_state:
+            check_game_state(self)
 
         self.log_string(
             """
@@ -226,17 +509,24 @@ class Game:
             self.log_string("You hit three fails, you lose! Good day sir.")
         elif len(self.deck) <= 0:
             self.log_string("Out of cards")
-        elif sum(self.played_numbers.values()) >= 5 * len(self.suits):
+        elif self.get_score() >= 5 * len(self.suits):
             self.log_string("You got a perfect score!!")
         else:
             self.assert_(False)
 
         return self.get_score()
 
+    def end_turn(self):
+        if not self.deck:
+            self.turn_timer -= 1
+
+        self.advance_player()
+        self.current_turn += 1
+
     def repr_played_cards(self):
         repr = "Played cards:\n"
         for s in self.suits:
-            repr += "  - {}: {}\n".format(str(s), self.played_numbers[s])
+            repr += "  - {}: {}\n".format(str(s), self.get_played_number(s))
         return repr
 
     def repr_players(self):
@@ -261,12 +551,22 @@ Current player: {}
             self.repr_players(),
         )
 
-    def log_string(self, s):
-        log_string(s, self.log_file, self.should_print)
+    def log(self, message, *args):
+        """Logs message.format(*args), only formatting it if logging is enabled"""
+        if self.should_log:
+            log_string(message.format(*args), self.log_file, self.should_print)
 
-    def assert_(self, condition):
-        assert condition, "{}-player {} Seed {} Turn {}".format(
-            self.num_players, self.strategy, self.seed, self.current_turn
+    def log_string(self, s):
+        if self.should_log:
+            log_string(s, self.log_file, self.should_print)
+
+    def assert_(self, condition, message=None):
+        assert condition, "{}-player {} Seed {} Turn {}{}".format(
+            self.num_players,
+            self.strategy,
+            self.seed,
+            self.current_turn,
+            ": " + message if message else "",
         )
 
 
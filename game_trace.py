@@ -0,0 +1,91 @@
+from collections import namedtuple
+import struct
+
+from cards import SUIT_INDEXES, Hint, encode_card
+
+# One fixed-width record per action:
+# game index, turn, player, action, card, hinted player, hint type, hint value
+RECORD = struct.Struct("<IHBBBBBB")
+
+ACTION_PLAY = 0
+ACTION_MISPLAY = 1
+ACTION_DISCARD = 2
+ACTION_HINT = 3
+
+HINT_TYPE_NONE = 0
+HINT_TYPE_SUIT = 1
+HINT_TYPE_NUMBER = 2
+
+# Stored in the card and hint fields when the action doesn't have one
+NO_VALUE = 255
+
+TraceRecord = namedtuple(
+    "TraceRecord",
+    [
+        "game",
+        "turn",
+        "player",
+        "action",
+        "card",
+        "hint_player",
+        "hint_type",
+        "hint_value",
+    ],
+)
+
+
+class TraceWriter:
+    """Binary game trace sink, cheap enough to leave on for large runs.
+
+    Records are packed with RECORD and written through a large write buffer.
+    Cards are stored as cards.encode_card codes, suit hints as the suit index."""
+
+    def __init__(self, path, buffer_size=1 << 20):
+        self.file = open(path, "wb", buffering=buffer_size)
+        self.game_index = 0
+
+    def start_game(self, game_index):
+        self.game_index = game_index
+
+    def record_card(self, turn, player, action, card):
+        self.file.write(
+            RECORD.pack(
+                self.game_index,
+                turn,
+                player,
+                action,
+                encode_card(card.suit, card.number),
+                NO_VALUE,
+                HINT_TYPE_NONE,
+                NO_VALUE,
+            )
+        )
+
+    def record_hint(self, turn, player, hint):
+        if hint.type == Hint.TYPE_SUIT:
+            hint_type = HINT_TYPE_SUIT
+            hint_value = SUIT_INDEXES[hint.value]
+        else:
+            hint_type = HINT_TYPE_NUMBER
+            hint_value = hint.value
+        self.file.write(
+            RECORD.pack(
+                self.game_index,
+                turn,
+                player,
+                ACTION_HINT,
+                NO_VALUE,
+                hint.player.player_number,
+                hint_type,
+                hint_value,
+            )
+        )
+
+    def close(self):
+        self.file.close()
+
+
+def read_trace(path):
+    with open(path, "rb") as f:
+        for record in RECORD.iter_unpack(f.read()):
+            yield TraceRecord(*record)
@@ -1,74 +1,75 @@
 #!/usr/bin/python
-from collections import defaultdict
 import multiprocessing as mp
-from multiprocessing import process
+import random
 
 import click
-from numpy import mean
-
-from game import Game
 
+from evaluation import WeightEvaluator
+from players import STRATEGIES
+from result_store import ResultStore
+from search import OPTIMIZERS
 
 LOG_PATH = "/Users/reed/hanabi/game_logs/"
-PARAM_RANGE = 5
-SEARCH_INTERVAL = 1
 
 
 @click.command()
 @click.option("--trials", "-t", type=click.INT)
 @click.option("--parameter", "-p", "params", multiple=True)
 @click.option("--process-num", default=6)
-def find_optimal_params(trials, params, process_num):
+@click.option("--optimizer", type=click.Choice(OPTIMIZERS), default="hill-climb")
+@click.option("--strategy", "-s", type=click.Choice(STRATEGIES), default="INFO")
+@click.option("--num-players", "-n", type=click.IntRange(2, 5), default=3)
+@click.option("--use-rainbow", is_flag=True, default=False)
+@click.option("--population", default=16)
+@click.option("--generations", default=10)
+@click.option("--master-seed", type=click.INT, default=0)
+@click.option("--round-size", default=100)
+@click.option("--confidence-z", default=3.0)
+@click.option("--store", "store_path", type=click.Path(dir_okay=False), default=None)
+def find_optimal_params(
+    trials,
+    params,
+    process_num,
+    optimizer,
+    strategy,
+    num_players,
+    use_rainbow,
+    population,
+    generations,
+    master_seed,
+    round_size,
+    confidence_z,
+    store_path,
+):
     assert process_num <= mp.cpu_count()
     pool = mp.Pool(process_num)
-
-    best_score = -2
-    best_weights = None
-
-    new_best_score = -1
-    new_best_weights = defaultdict(float)
-    for p in params:
-        new_best_weights[p] = PARAM_RANGE / 2
-    while new_best_score > best_score:
-        best_score = new_best_score
-        best_weights = new_best_weights
-
-        new_best_score = -1
-        new_best_weights = None
-
-        neighbor_weights = []
-        for p in params:
-            new_weights = best_weights.copy()
-            new_weights[p] += SEARCH_INTERVAL
-            neighbor_weights.append(new_weights)
-
-            new_weights = best_weights.copy()
-            new_weights[p] -= SEARCH_INTERVAL
-            neighbor_weights.append(new_weights)
-
-        for w in neighbor_weights:
-            click.echo("Trying weights {}".format(w))
-            trial_args = [w for _ in range(trials)]
-            scores = pool.map_async(score_weights, trial_args).get()
-            score = mean(list(scores))
-            click.echo("Score is {}".format(score))
-            if score > new_best_score:
-                new_best_score = score
-                new_best_weights = w
+    store = ResultStore(store_path) if store_path else None
+    evaluator = WeightEvaluator(
+        pool,
+        trials,
+        strategy=strategy,
+        num_players=num_players,
+        use_rainbow=use_rainbow,
+        master_seed=master_seed,
+        round_size=round_size,
+        confidence_z=confidence_z,
+        store=store,
+    )
+    search = OPTIMIZERS[optimizer](
+        evaluator,
+        params,
+        random.Random(master_seed),
+        population=population,
+        generations=generations,
+    )
+    best_score, best_weights = search.run()
 
     pool.close()
+    pool.join()
+    if store:
+        store.close()
     click.echo("Best score: {}".format(best_score))
-    click.echo("Best weights: {}".format(best_weights))
-
-
-def score_weights(weights):
-    g = Game(
-        3,
-        "INFO",
-        should_print=False,
-        weights=weights,
-    )
-    return g.run_game()
+    click.echo("Best weights: {}".format(dict(best_weights)))
 
 
 if __name__ == "__main__":
@@ -1,12 +1,26 @@
 #!/usr/bin/python
 from collections import defaultdict
 from datetime import datetime
+from itertools import combinations, repeat
+import multiprocessing as mp
+from multiprocessing.pool import ThreadPool
+import os
+import random
+import sys
 
 import click
-from numpy import mean, percentile, std
 from tabulate import tabulate
 
+from batch_game import BatchGame
+from compact_game import CompactGame
+from deck_corpus import load_corpus
 from game import Game, log_string
+from game_trace import TraceWriter
+from profiling import PhaseProfile, profiled_game_class
+from result_store import ResultStore
+from seeding import MASK_64, derive_seed
+from stats import PairedDifference, ScoreAccumulator
+from validation import VALIDATION_CHEAP, VALIDATION_LEVELS
 
 LOG_PATH = "/Users/reed/hanabi/game_logs/"
 
@@ -19,6 +33,25 @@ LOG_PATH = "/Users/reed/hanabi/game_logs/"
 @click.option("--use-rainbow", is_flag=True, default=False)
 @click.option("--num-players", "-n", multiple=True, default=[2])
 @click.option("--seed", type=click.INT, default=None)
+@click.option("--master-seed", type=click.INT, default=None)
+@click.option("--workers", type=click.INT, default=1)
+@click.option("--threads", type=click.INT, default=1)
+@click.option("--chunk-size", type=click.INT, default=500)
+@click.option("--progress-every", type=click.INT, default=None)
+@click.option("--compact", is_flag=True, default=False)
+@click.option("--batch", is_flag=True, default=False)
+@click.option("--trace-dir", type=click.Path(file_okay=False), default=None)
+@click.option("--profile", is_flag=True, default=False)
+@click.option("--store", "store_path", type=click.Path(dir_okay=False), default=None)
+@click.option("--compare", is_flag=True, default=False)
+@click.option(
+    "--deck-corpus", type=click.Path(exists=True, dir_okay=False), default=None
+)
+@click.option("--confidence-z", type=click.FLOAT, default=3.0)
+@click.option(
+    "--validation", type=click.Choice(VALIDATION_LEVELS), default=VALIDATION_CHEAP
+)
+@click.option("--validation-sample", type=click.FLOAT, default=0.1)
 @click.option(
     "--weight",
     "-w",
@@ -35,13 +68,71 @@ def run_simulations(
     use_rainbow,
     num_players,
     seed,
+    master_seed,
+    workers,
+    threads,
+    chunk_size,
+    progress_every,
+    compact,
+    batch,
+    trace_dir,
+    profile,
+    store_path,
+    compare,
+    confidence_z,
+    deck_corpus,
+    validation,
+    validation_sample,
     param_weights,
 ):
-    PERFECT_SCORE = (6 if use_rainbow else 5) * 5
     log_file_name = (
         LOG_PATH + "hanabi_log_" + datetime.now().isoformat(timespec="seconds") + ".txt"
     )
 
+    parallel = workers > 1 or threads > 1
+    if workers > 1 and threads > 1:
+        raise click.UsageError("--workers and --threads are mutually exclusive")
+    if parallel and (create_logs or verbose or profile):
+        raise click.UsageError(
+            "--create-logs, --verbose and --profile are only supported with --workers 1"
+            " and --threads 1"
+        )
+    if seed is not None and master_seed is not None:
+        raise click.UsageError("--seed and --master-seed are mutually exclusive")
+    if deck_corpus:
+        # Games deal the corpus' decks, which are those of its master seed's games
+        corpus = load_corpus(deck_corpus)
+        if seed is not None or master_seed not in (None, corpus.master_seed):
+            raise click.UsageError(
+                "--deck-corpus only has the games of master seed {}".format(
+                    corpus.master_seed
+                )
+            )
+        if num_games > corpus.count:
+            raise click.UsageError(
+                "--deck-corpus only has {} decks".format(corpus.count)
+            )
+        master_seed = corpus.master_seed
+    if store_path and master_seed is None:
+        raise click.UsageError(
+            "--store needs --master-seed, so every game has a reproducible seed"
+        )
+    if compare and (len(strategies) < 2 or seed is not None or profile):
+        raise click.UsageError(
+            "--compare needs at least two strategies, and a different deck every game,"
+            " so it can't be used with --seed (or --profile)"
+        )
+    if compare and (verbose or progress_every):
+        raise click.UsageError(
+            "--compare can't be used with --verbose or --progress-every"
+        )
+    if (parallel or compare) and seed is None and master_seed is None:
+        # Parallel runs and comparisons are always reproducible, so pick a master seed
+        # and report it
+        master_seed = random.SystemRandom().randint(0, MASK_64)
+    if master_seed is not None:
+        log_string("Master seed: {}".format(master_seed), None, should_print=True)
+
     log_file = None
     if create_logs:
         log_file = open(log_file_name, "w")
@@ -50,6 +141,73 @@ def run_simulations(
     for p, w in param_weights:
         weights[p] = w
 
+    game_class = CompactGame if compact else Game
+    if batch:
+        unsupported = set(strategies) - set(BatchGame.SUPPORTED_STRATEGIES)
+        if unsupported:
+            raise click.UsageError(
+                "--batch only supports {}, not {}".format(
+                    ", ".join(BatchGame.SUPPORTED_STRATEGIES),
+                    ", ".join(sorted(unsupported)),
+                )
+            )
+        if create_logs or verbose or trace_dir or profile or compact:
+            raise click.UsageError(
+                "--batch can't be used with --create-logs, --verbose, --trace-dir, "
+                "--profile or --compact"
+            )
+        game_class = BatchGame
+    if trace_dir:
+        os.makedirs(trace_dir, exist_ok=True)
+
+    # Profiles are per strategy, summed over the player counts
+    profiles = defaultdict(PhaseProfile)
+
+    # With a store, only the games whose outcomes aren't stored yet are played
+    store = ResultStore(store_path) if store_path else None
+    plans = {}
+    if not compare:
+        for n in num_players:
+            for strategy in strategies:
+                plans[(n, strategy)] = plan_games(
+                    store,
+                    game_class,
+                    get_game_args(
+                        n, strategy, use_rainbow, weights, validation, validation_sample
+                    ),
+                    seed,
+                    master_seed,
+                    num_games,
+                    chunk_size,
+                )
+
+    pool = None
+    pending_results = {}
+    if parallel:
+        # Games have their own rng, so threads can play them side by side, without
+        # pickling anything, though they only run in parallel on free-threaded builds
+        pool = mp.Pool(workers) if workers > 1 else ThreadPool(threads)
+        # Queue every chunk up front so the pool never idles between strategies
+        for n, strategy in plans:
+            _, _, ranges = plans[(n, strategy)]
+            chunks = [
+                (
+                    game_class,
+                    get_game_args(
+                        n, strategy, use_rainbow, weights, validation, validation_sample
+                    ),
+                    seed,
+                    master_seed,
+                    start,
+                    stop,
+                    trace_dir,
+                    store is not None,
+                    deck_corpus,
+                )
+                for start, stop in ranges
+            ]
+            pending_results[(n, strategy)] = pool.imap(play_chunk, chunks)
+
     for n in num_players:
         log_string(
             """
@@ -66,57 +224,441 @@ Simulations for {} players {}
             should_print=True,
         )
 
-        results = []
-        for strategy in strategies:
-            scores = []
-            wasted_discard_pcts = []
-            for _ in range(num_games):
-                g = Game(
+        if compare:
+            log_string(
+                compare_strategies(
+                    game_class,
                     n,
-                    strategy,
+                    strategies,
                     use_rainbow,
-                    should_print=verbose,
-                    log_file=log_file,
-                    seed=seed,
-                    weights=weights,
-                )
-                scores.append(g.run_game())
-                wasted_discard_pcts.append(g.wasted_discards / g.current_turn)
-            results.append(
-                [
-                    strategy,
-                    round(mean(scores), 2),
-                    percentile(scores, 10),
-                    percentile(scores, 50),
-                    percentile(scores, 90),
-                    round((scores.count(PERFECT_SCORE) / num_games) * 100, 2),
-                    round(std(scores), 2),
-                    round(mean(wasted_discard_pcts) * 100, 2),
-                ]
+                    weights,
+                    master_seed,
+                    num_games,
+                    chunk_size,
+                    # One chunk per worker and strategy in each round
+                    chunk_size * max(workers, threads),
+                    confidence_z,
+                    pool,
+                    store,
+                    trace_dir,
+                    deck_corpus,
+                    validation,
+                    validation_sample,
+                ),
+                log_file,
+                should_print=True,
             )
+            continue
 
-        result_table = (
-            tabulate(
-                results,
-                headers=[
-                    "Strategy",
-                    "Mean",
-                    "P10",
-                    "P50",
-                    "P90",
-                    "Perfect",
-                    "std",
-                    "Wasted discard %",
-                ],
-                tablefmt="pretty",
-            )
-            + "\n"
+        results = []
+        for strategy in strategies:
+            config, accumulator, ranges = plans[(n, strategy)]
+            if pool:
+                chunk_results = pending_results[(n, strategy)]
+            else:
+                strategy_game_class = game_class
+                if profile:
+                    strategy_game_class = profiled_game_class(
+                        game_class, profiles[strategy]
+                    )
+                chunk_results = (
+                    play_games(
+                        strategy_game_class,
+                        get_game_args(
+                            n,
+                            strategy,
+                            use_rainbow,
+                            weights,
+                            validation,
+                            validation_sample,
+                        ),
+                        get_game_seeds(seed, master_seed, start, stop),
+                        start,
+                        trace_dir,
+                        should_print=verbose,
+                        log_file=log_file,
+                        record=store is not None,
+                        deck_corpus=deck_corpus,
+                    )
+                    for start, stop in ranges
+                )
+
+            next_progress = progress_every
+            for chunk_accumulator, chunk_outcomes in chunk_results:
+                accumulator.merge(chunk_accumulator)
+                if store:
+                    store.save(config, chunk_outcomes)
+                if progress_every and accumulator.count >= next_progress:
+                    next_progress += progress_every * (
+                        (accumulator.count - next_progress) // progress_every + 1
+                    )
+                    log_string(
+                        format_results(
+                            [result_row(strategy, accumulator)],
+                            "{}-player progress: {} / {} games".format(
+                                n, accumulator.count, num_games
+                            ),
+                        ),
+                        log_file,
+                        should_print=True,
+                    )
+            results.append(result_row(strategy, accumulator))
+
+        log_string(format_results(results), log_file, should_print=True)
+
+    for strategy, strategy_profile in profiles.items():
+        log_string(
+            strategy_profile.format("{} phase profile".format(strategy)),
+            log_file,
+            should_print=True,
         )
-        log_string(result_table, log_file, should_print=True)
 
+    if pool:
+        pool.close()
+        pool.join()
+    if store:
+        store.close()
     if log_file:
         log_file.close()
 
 
+def result_row(strategy, accumulator):
+    return [
+        strategy,
+        round(accumulator.mean(), 2),
+        accumulator.percentile(10),
+        accumulator.percentile(50),
+        accumulator.percentile(90),
+        round(accumulator.perfect_pct(), 2),
+        round(accumulator.std(), 2),
+        round(accumulator.wasted_discard_pct(), 2),
+    ]
+
+
+def format_results(results, title=None):
+    result_table = (
+        tabulate(
+            results,
+            headers=[
+                "Strategy",
+                "Mean",
+                "P10",
+                "P50",
+                "P90",
+                "Perfect",
+                "std",
+                "Wasted discard %",
+            ],
+            tablefmt="pretty",
+        )
+        + "\n"
+    )
+    if title:
+        result_table = title + "\n" + result_table
+    return result_table
+
+
+def perfect_score(use_rainbow):
+    return (6 if use_rainbow else 5) * 5
+
+
+def get_game_args(
+    n, strategy, use_rainbow, weights, validation=VALIDATION_CHEAP, validation_sample=1
+):
+    return {
+        "num_players": n,
+        "strategy": strategy,
+        "use_rainbow": use_rainbow,
+        "weights": weights,
+        "validation": validation,
+        "validation_sample": validation_sample,
+    }
+
+
+def compare_strategies(
+    game_class,
+    num_players,
+    strategies,
+    use_rainbow,
+    weights,
+    master_seed,
+    num_games,
+    chunk_size,
+    round_size,
+    confidence_z,
+    pool=None,
+    store=None,
+    trace_dir=None,
+    deck_corpus=None,
+    validation=VALIDATION_CHEAP,
+    validation_sample=1,
+):
+    """Plays every strategy on the same seeds, in rounds of round_size games, until
+    the paired score difference of every pair of strategies is settled (its
+    confidence interval excludes 0) or num_games have been played. Returns the
+    results and the paired differences, formatted.
+
+    The intervals are checked after every round, so a z well above 2 (3 by default)
+    keeps the chance of settling on the wrong ranking low."""
+    accumulators = {s: ScoreAccumulator(perfect_score(use_rainbow)) for s in strategies}
+    differences = {pair: PairedDifference() for pair in combinations(strategies, 2)}
+
+    for round_start, round_stop in chunk_ranges(num_games, round_size):
+        seeds = list(get_game_seeds(None, master_seed, round_start, round_stop))
+        # Every strategy's chunks are queued before any is collected
+        pending = []
+        for strategy in strategies:
+            game_args = get_game_args(
+                num_players,
+                strategy,
+                use_rainbow,
+                weights,
+                validation,
+                validation_sample,
+            )
+            config = None
+            stored = {}
+            ranges = chunk_ranges(round_stop - round_start, chunk_size)
+            if store:
+                config = store.config_key(game_class, **game_args)
+                stored = store.load(config, seeds)
+                ranges = missing_chunk_ranges(seeds, stored, chunk_size)
+            chunks = [
+                (
+                    game_class,
+                    game_args,
+                    None,
+                    master_seed,
+                    round_start + start,
+                    round_start + stop,
+                    trace_dir,
+                    True,
+                    deck_corpus,
+                )
+                for start, stop in ranges
+            ]
+            chunk_results = (pool.imap if pool else map)(play_chunk, chunks)
+            pending.append((strategy, config, stored, chunk_results))
+
+        scores = {}
+        for strategy, config, stored, chunk_results in pending:
+            for _, outcomes in chunk_results:
+                if store:
+                    store.save(config, outcomes)
+                stored.update((s, tuple(outcome)) for s, *outcome in outcomes)
+            scores[strategy] = []
+            for s in seeds:
+                score, wasted_discards, turns = stored[s]
+                accumulators[strategy].add(score, wasted_discards / turns)
+                scores[strategy].append(score)
+
+        for (a, b), difference in differences.items():
+            for score_a, score_b in zip(scores[a], scores[b]):
+                difference.add(score_a - score_b)
+        if all(d.is_settled(confidence_z) for d in differences.values()):
+            break
+
+    return format_results(
+        [result_row(s, accumulator) for s, accumulator in accumulators.items()]
+    ) + format_differences(differences, confidence_z)
+
+
+def format_differences(differences, confidence_z):
+    rows = []
+    for (a, b), difference in differences.items():
+        low, high = difference.interval(confidence_z)
+        if low > 0:
+            verdict = "{} better".format(a)
+        elif high < 0:
+            verdict = "{} better".format(b)
+        elif difference.count and not difference.diff_square_sum:
+            verdict = "Identical"
+        else:
+            verdict = "Unsettled"
+        rows.append(
+            [
+                "{} - {}".format(a, b),
+                difference.count,
+                round(difference.mean(), 3),
+                round(low, 3),
+                round(high, 3),
+                verdict,
+            ]
+        )
+    return (
+        "Paired score differences ({} standard errors)\n".format(confidence_z)
+        + tabulate(
+            rows,
+            headers=["Difference", "Games", "Mean", "Low", "High", "Result"],
+            tablefmt="pretty",
+        )
+        + "\n"
+    )
+
+
+def plan_games(store, game_class, game_args, seed, master_seed, num_games, chunk_size):
+    """Returns the store configuration, an accumulator of the stored outcomes and the
+    chunk ranges of the games left to play. Without a store, every game is played"""
+    accumulator = ScoreAccumulator(perfect_score(game_args["use_rainbow"]))
+    if not store:
+        return None, accumulator, list(chunk_ranges(num_games, chunk_size))
+
+    config = store.config_key(game_class, **game_args)
+    seeds = list(get_game_seeds(seed, master_seed, 0, num_games))
+    stored = store.load(config, seeds)
+    for s in seeds:
+        if s in stored:
+            score, wasted_discards, turns = stored[s]
+            accumulator.add(score, wasted_discards / turns)
+    return config, accumulator, list(missing_chunk_ranges(seeds, stored, chunk_size))
+
+
+def play_games(
+    game_class,
+    game_args,
+    seeds,
+    first_game_index=0,
+    trace_dir=None,
+    should_print=False,
+    log_file=None,
+    record=False,
+    deck_corpus=None,
+):
+    """Returns an accumulator of the games' results, and if record is set, a list of
+    (seed, score, wasted discards, turns) for every game (None otherwise). With a
+    deck corpus, game i deals the corpus' deck i"""
+    corpus = load_corpus(deck_corpus) if deck_corpus else None
+    if game_class is BatchGame:
+        seeds = list(seeds)
+        decks = None
+        if corpus:
+            decks = corpus.get_decks(
+                first_game_index,
+                first_game_index + len(seeds),
+                game_args["use_rainbow"],
+            )
+        return play_batch(game_args, seeds, record, decks)
+
+    trace = None
+    if trace_dir:
+        trace = TraceWriter(
+            os.path.join(
+                trace_dir,
+                "{}_{}p_{:09d}.trace".format(
+                    game_args["strategy"], game_args["num_players"], first_game_index
+                ),
+            )
+        )
+
+    accumulator = ScoreAccumulator(perfect_score(game_args["use_rainbow"]))
+    outcomes = [] if record else None
+    # One game is reset for every seed, rather than built again with its players
+    g = None
+    for game_index, game_seed in enumerate(seeds, first_game_index):
+        if trace:
+            trace.start_game(game_index)
+        deck_codes = (
+            corpus.get_deck(game_index, game_args["use_rainbow"]) if corpus else None
+        )
+        if g is None:
+            g = game_class(
+                **game_args,
+                should_print=should_print,
+                log_file=log_file,
+                seed=game_seed,
+                trace=trace,
+                deck_codes=deck_codes,
+            )
+        else:
+            g.reset(game_seed, deck_codes)
+        score = g.run_game()
+        accumulator.add(score, g.wasted_discards / g.current_turn)
+        if record:
+            outcomes.append((g.seed, score, g.wasted_discards, g.current_turn))
+
+    if trace:
+        trace.close()
+    return accumulator, outcomes
+
+
+def play_batch(game_args, seeds, record=False, decks=None):
+    # Batches need every seed up front, so unseeded games get a random one like Game
+    rng = random.Random()
+    seeds = [s if s else rng.randint(0, sys.maxsize - 1) for s in seeds]
+    b = BatchGame(
+        game_args["num_players"],
+        game_args["strategy"],
+        seeds,
+        game_args["use_rainbow"],
+        decks,
+    )
+    scores = b.run_games()
+
+    accumulator = ScoreAccumulator(perfect_score(game_args["use_rainbow"]))
+    outcomes = [] if record else None
+    for game_seed, score, wasted_discards, turns in zip(
+        seeds, scores.tolist(), b.wasted_discards.tolist(), b.turns.tolist()
+    ):
+        accumulator.add(score, wasted_discards / turns)
+        if record:
+            outcomes.append((game_seed, score, wasted_discards, turns))
+    return accumulator, outcomes
+
+
+def play_chunk(args):
+    """Pool entry point: plays the games with indexes [start, stop) of one run"""
+    (
+        game_class,
+        game_args,
+        seed,
+        master_seed,
+        start,
+        stop,
+        trace_dir,
+        record,
+        deck_corpus,
+    ) = args
+    return play_games(
+        game_class,
+        game_args,
+        get_game_seeds(seed, master_seed, start, stop),
+        start,
+        trace_dir,
+        record=record,
+        deck_corpus=deck_corpus,
+    )
+
+
+def chunk_ranges(num_games, chunk_size):
+    for start in range(0, num_games, chunk_size):
+        yield start, min(start + chunk_size, num_games)
+
+
+def missing_chunk_ranges(seeds, stored, chunk_size):
+    """Chunk ranges of the games whose seeds have no stored outcome"""
+    start = 0
+    while start < len(seeds):
+        if seeds[start] in stored:
+            start += 1
+            continue
+        stop = start + 1
+        while (
+            stop < len(seeds)
+            and stop - start < chunk_size
+            and seeds[stop] not in stored
+        ):
+            stop += 1
+        yield start, stop
+        start = stop
+
+
+def get_game_seeds(seed, master_seed, start, stop):
+    """Seeds for the games with indexes [start, stop). A master seed gives every game
+    its own reproducible seed, otherwise every game uses `seed` (None is random)"""
+    if master_seed is None:
+        return repeat(seed, stop - start)
+    return (derive_seed(master_seed, i) for i in range(start, stop))
+
+
 if __name__ == "__main__":
     run_simulations()
@@ -11,6 +11,7 @@ from .protecting_player import (
     ProtectSort4Player,
 )
 from .info_player import InfoPlayer
+from .rollout_player import RolloutPlayer
 
 STRATEGIES = {
     "FIRST_CARD": FirstCardPlayer,
@@ -26,4 +27,5 @@ STRATEGIES = {
     "PROTECT_SORT_4": ProtectSort4Player,
     "BORDERLINE": BorderlineHintPlayer,
     "INFO": InfoPlayer,
+    "ROLLOUT": RolloutPlayer,
 }
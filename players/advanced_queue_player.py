@@ -1,4 +1,3 @@
-from collections import defaultdict
 from .basic_queue_player import BasicQueuePlayer
 
 
@@ -8,7 +7,8 @@ class AdvancedQueuePlayer(BasicQueuePlayer):
         needed_numbers = self.game.get_needed_numbers()
         if hint.type == hint.TYPE_SUIT and hint.value in needed_numbers:
             target_card.hinted_number = needed_numbers[hint.value]
-            self.game.assert_(target_card.hinted_number == target_card.number)
+            if self.game.check_invariants:
+                self.game.assert_(target_card.hinted_number == target_card.number)
         if (
             hint.type == hint.TYPE_NUMBER
             and hint.value in needed_numbers.values()
@@ -17,30 +17,23 @@ class AdvancedQueuePlayer(BasicQueuePlayer):
             for suit, number in needed_numbers.items():
                 if number == hint.value:
                     target_card.hinted_suit = suit
-                    self.game.assert_(target_card.hinted_suit == target_card.suit)
+                    if self.game.check_invariants:
+                        self.game.assert_(target_card.hinted_suit == target_card.suit)
 
         super().act_on_target(target_card, hint)
 
-    def find_hints(self, players):
-        hints = super().find_hints(players)
-
-        pending_play = defaultdict(list)
+    def get_pending_play(self):
+        # Cards in other players' play queues, and our own cards we know to be playable
+        pending_play = set()
         for p in self.game.players:
             if p == self:
                 continue
             for c in p.play_queue:
-                pending_play[c.suit].append(c.number)
+                pending_play.add((c.suit, c.number))
         for c in self.play_queue:
             if c.hinted_suit and c.hinted_number:
-                pending_play[c.hinted_suit].append(c.hinted_number)
-
-        pruned_hints = []
-        for h in hints:
-            c = h.target_card
-            if c and c.number not in pending_play[c.suit]:
-                pruned_hints.append(h)
-
-        return pruned_hints
+                pending_play.add((c.hinted_suit, c.hinted_number))
+        return pending_play
 
     def receive_hint(self, hint):
         super().receive_hint(hint)
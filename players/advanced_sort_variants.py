@@ -8,6 +8,22 @@ class SortBasePlayer(AdvancedQueuePlayer):
     CARD_NUMBER_WEIGHT = 0
     AFFECTED_CARD_WEIGHT = 0
 
+    def __init__(self, game, player_number, weights):
+        super().__init__(game, player_number, weights)
+        self.affected_card_counts = {}
+        self.affected_card_counts_turn = None
+
+    def fork(self, game, cards):
+        player = super().fork(game, cards)
+        player.affected_card_counts = {}
+        player.affected_card_counts_turn = None
+        return player
+
+    def reset(self):
+        super().reset()
+        self.affected_card_counts = {}
+        self.affected_card_counts_turn = None
+
     def score_hint(self, hint):
         score = 0
         score += (5 - len(hint.player.play_queue)) * self.QUEUE_LENGTH_WEIGHT
@@ -21,20 +37,57 @@ class SortBasePlayer(AdvancedQueuePlayer):
 
         score += (5 - hint.target_card.number) * self.CARD_NUMBER_WEIGHT
 
-        affected_card_count = 0
-        for c in hint.player.discard_queue:
-            if not c.match_hint(hint):
-                continue
-            if (hint.type == Hint.TYPE_SUIT and (not c.hinted_suit)) or (
-                hint.type == Hint.TYPE_NUMBER and (not c.hinted_number)
-            ):
-                affected_card_count += 1
-        score += affected_card_count * self.AFFECTED_CARD_WEIGHT
+        score += self.get_affected_card_count(hint) * self.AFFECTED_CARD_WEIGHT
 
         return score
 
+    def get_affected_card_count(self, hint):
+        """How many cards in the receiver's discard queue the hint tells something new.
+        This only depends on the receiver, type and value, so it is cached for the
+        rest of the turn"""
+        if self.affected_card_counts_turn != self.game.current_turn:
+            self.affected_card_counts = {}
+            self.affected_card_counts_turn = self.game.current_turn
+
+        key = (hint.player.player_number, hint.type, hint.value)
+        if key not in self.affected_card_counts:
+            affected_card_count = 0
+            for c in hint.player.discard_queue:
+                if not c.match_hint(hint):
+                    continue
+                if (hint.type == Hint.TYPE_SUIT and (not c.hinted_suit)) or (
+                    hint.type == Hint.TYPE_NUMBER and (not c.hinted_number)
+                ):
+                    affected_card_count += 1
+            self.affected_card_counts[key] = affected_card_count
+        return self.affected_card_counts[key]
+
+    def unique_hints(self, hints):
+        """The first hint for each (player, type, value), in order. Later ones give
+        the receiver the same hint, and it acts on its first matching card"""
+        seen = set()
+        unique = []
+        for h in hints:
+            key = (h.player.player_number, h.type, h.value)
+            if key not in seen:
+                seen.add(key)
+                unique.append(h)
+        return unique
+
     def sort_hints(self, hints):
-        return sorted(hints, key=self.score_hint, reverse=True)
+        return sorted(self.unique_hints(hints), key=self.score_hint, reverse=True)
+
+    def best_hint(self, hints):
+        """The first of the highest scoring hints, like sort_hints(hints)[0], and its
+        score, in one pass"""
+        top_hint = None
+        top_score = None
+        for h in self.unique_hints(hints):
+            score = self.score_hint(h)
+            if top_hint is None or score > top_score:
+                top_hint = h
+                top_score = score
+        return top_hint, top_score
 
 
 class Sort1Player(SortBasePlayer):
@@ -4,60 +4,73 @@ from .queue_player import QueuePlayer
 
 class BasicQueuePlayer(QueuePlayer):
     def take_action(self):
-        hints = self.find_hints(self.game.players)
-
         if self.play_queue:
             self.play_from_hand()
-        elif self.game.hints > 0 and hints:
-            self.game.give_hint(self.sort_hints(hints)[0])
+            return
+
+        top_hint, _ = self.best_hint(self.find_hints(self.game.players))
+        if self.game.hints > 0 and top_hint:
+            self.game.give_hint(top_hint)
         else:
             self.discard_from_hand()
 
     def find_hints(self, players):
+        """Hints that make a teammate play a card: a suit or number hint whose first
+        match in their discard queue is playable. Found in one pass over each discard
+        queue, skipping cards that get_pending_play says are already going to be
+        played"""
         hints = []
 
         needed_numbers = self.game.get_needed_numbers()
+        pending_play = self.get_pending_play()
 
         for p in players:
             if p == self:
                 continue
 
+            # Suits and numbers of the cards before the current one in the queue
+            seen_suits = []
+            seen_numbers = []
             for target_card in p.discard_queue:
-                if needed_numbers.get(target_card.suit) != target_card.number:
-                    continue
-
-                matching_suits = [
-                    c for c in p.discard_queue if c.suit == target_card.suit
-                ]
-
+                suit = target_card.suit
+                number = target_card.number
                 # We only want to give a hint if the first match should be played
-                if target_card == matching_suits[0]:
-                    hints.append(
-                        Hint(
-                            p,
-                            Hint.TYPE_SUIT,
-                            target_card.suit,
-                            self.game,
-                            target_card=target_card,
+                if needed_numbers.get(suit) == number and (
+                    pending_play is None or (suit, number) not in pending_play
+                ):
+                    if suit not in seen_suits:
+                        hints.append(
+                            Hint(
+                                p,
+                                Hint.TYPE_SUIT,
+                                suit,
+                                self.game,
+                                target_card=target_card,
+                            )
                         )
-                    )
-
-                matching_numbers = [
-                    c for c in p.discard_queue if c.number == target_card.number
-                ]
-
-                # We only want to give a hint if the first match should be played
-                if target_card == matching_numbers[0]:
-                    hints.append(
-                        Hint(
-                            p,
-                            Hint.TYPE_NUMBER,
-                            target_card.number,
-                            self.game,
-                            target_card=target_card,
+                    if number not in seen_numbers:
+                        hints.append(
+                            Hint(
+                                p,
+                                Hint.TYPE_NUMBER,
+                                number,
+                                self.game,
+                                target_card=target_card,
+                            )
                         )
-                    )
+                seen_suits.append(suit)
+                seen_numbers.append(number)
         return hints
 
+    def get_pending_play(self):
+        """Set of (suit, number) that find_hints shouldn't hint because they are
+        already going to be played, or None"""
+        return None
+
     def sort_hints(self, hints):
         return hints
+
+    def best_hint(self, hints):
+        """Returns the hint sort_hints would put first and its score, or (None, None)
+        if there are no hints. Hints aren't scored here, so the score is None"""
+        return (hints[0] if hints else None), None
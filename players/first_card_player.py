@@ -2,8 +2,8 @@ from .player import Player
 
 
 class FirstCardPlayer(Player):
-    def __init__(self, game, player_number):
-        super().__init__(game, player_number)
+    def __init__(self, game, player_number, weights):
+        super().__init__(game, player_number, weights)
         self.cards = []
 
     def __repr__(self):
@@ -12,6 +12,15 @@ class FirstCardPlayer(Player):
             s += "  - {}\n".format(c)
         return s
 
+    def fork(self, game, cards):
+        player = super().fork(game, cards)
+        player.cards = [cards[c] for c in self.cards]
+        return player
+
+    def reset(self):
+        super().reset()
+        self.cards.clear()
+
     def get_hand(self):
         return self.cards
 
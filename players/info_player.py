@@ -1,4 +1,6 @@
-from cards import Hint
+from collections import defaultdict
+
+from cards import SUIT_INDEXES, Hint
 from .player import Player
 
 
@@ -6,6 +8,7 @@ class InfoPlayer(Player):
     def __init__(self, game, player_number, weights):
         super().__init__(game, player_number, weights)
         self.hand = []
+        self.update_hand_state()
 
     def __repr__(self):
         s = super().__repr__()
@@ -16,131 +19,146 @@ class InfoPlayer(Player):
 
     def _add_card(self, card):
         self.hand.append(card)
+        self.update_hand_state()
+
+    def fork(self, game, cards):
+        player = super().fork(game, cards)
+        player.hand = [cards[c] for c in self.hand]
+        player.unknown_suits = self.unknown_suits.copy()
+        player.unknown_numbers = self.unknown_numbers.copy()
+        return player
+
+    def reset(self):
+        super().reset()
+        self.hand.clear()
+        self.update_hand_state()
 
     def get_hand(self):
         return self.hand
 
+    def receive_hint(self, hint):
+        super().receive_hint(hint)
+        self.update_hand_state()
+
+    def update_hand_state(self):
+        """Recomputes the presence bitmasks, unknown counts and knowledge count of the
+        hand. Called whenever the hand or its hints change, so a turn can score every
+        hint without rescanning the hands"""
+        suit_mask = 0
+        number_mask = 0
+        unknown_suits = defaultdict(int)
+        unknown_numbers = defaultdict(int)
+        knowledge_count = 0
+        for c in self.hand:
+            suit_mask |= 1 << SUIT_INDEXES[c.suit]
+            number_mask |= 1 << c.number
+            if c.hinted_suit:
+                knowledge_count += 1
+            else:
+                unknown_suits[c.suit] += 1
+            if c.hinted_number:
+                knowledge_count += 1
+            else:
+                unknown_numbers[c.number] += 1
+
+        self.suit_mask = suit_mask
+        self.number_mask = number_mask
+        self.unknown_suits = unknown_suits
+        self.unknown_numbers = unknown_numbers
+        self.knowledge_count = knowledge_count
+
     def take_turn(self):
-        moves = []
-        for card in self.hand:
-            moves.append(PlayMove(card))
-            if self.game.hints < 8:
-                moves.append(DiscardMove(card))
-        if self.game.hints > 0:
-            for p in self.game.players:
-                hand = p.get_hand()
-                for suit in self.game.suits:
-                    if suit in [c.suit for c in hand]:
-                        moves.append(HintMove(Hint(p, Hint.TYPE_SUIT, suit, self.game)))
-                for number in range(1, self.game.MAX_NUMBER):
-                    if number in [c.number for c in hand]:
-                        moves.append(
-                            HintMove(Hint(p, Hint.TYPE_NUMBER, number, self.game))
-                        )
+        """Scores every legal move in one pass, in the order they used to be listed
+        (play and discard for each card, then suit and number hints for each player).
+        Only the chosen move is built into a Move."""
+        game = self.game
+        game_score = game.get_score()
+        hints = game.hints
+        fails = game.fails
+        knowledge_count = self.get_knowledge_count()
 
         best_score = -1
         best_move = None
 
-        for m in moves:
-            score = self.calculate_score(m)
+        for card in self.hand:
+            avg_score_increase, avg_fail_increase, avg_hint_increase = (
+                self.get_play_odds(card.hinted_suit, card.hinted_number)
+            )
+            score = self.score_state(
+                game_score + avg_score_increase,
+                knowledge_count,
+                hints + avg_hint_increase,
+                fails + avg_fail_increase,
+            )
             if score > best_score:
-                best_move = m
+                best_move = (PlayMove, card)
                 best_score = score
 
-        self.execute(best_move)
-
-    def calculate_score(self, move):
-        if isinstance(move, PlayMove):
-            possible_cards = []
-            for card in self.game.get_remaining_card_list():
-                if move.card.hinted_suit and move.card.hinted_number:
-                    if (
-                        move.card.hinted_suit == card.suit
-                        and move.card.hinted_number == card.number
-                    ):
-                        possible_cards.append(card)
-                elif move.card.hinted_suit:
-                    if move.card.hinted_suit == card.suit:
-                        possible_cards.append(card)
-                elif move.card.hinted_number:
-                    if move.card.hinted_number == card.number:
-                        possible_cards.append(card)
-                else:
-                    possible_cards.append(card)
-
-            playable_count = 0
-            playable_five_count = 0
-            for card in possible_cards:
-                if self.game.is_card_playable(card):
-                    playable_count += 1
-                    if card.number == 5:
-                        playable_five_count += 1
-            avg_score_increase = round(playable_count / len(possible_cards), 4)
-            avg_fail_increase = round(1 - avg_score_increase, 4)
-            avg_hint_increase = round(playable_five_count / len(possible_cards), 4)
-
-            return self.score_state(
-                self.game.get_score() + avg_score_increase,
-                self.get_knowledge_count(),
-                self.game.hints + avg_hint_increase,
-                self.game.fails + avg_fail_increase,
-            )
-
-        elif isinstance(move, HintMove):
-            knowledge_increase = 0
-            for c in move.hint.player.get_hand():
-                if (
-                    move.hint.type == Hint.TYPE_SUIT
-                    and move.hint.value == c.suit
-                    and (not c.hinted_suit)
-                ):
-                    knowledge_increase += 1
-                if (
-                    move.hint.type == Hint.TYPE_NUMBER
-                    and move.hint.value == c.number
-                    and (not c.hinted_number)
-                ):
-                    knowledge_increase += 1
-
-            return self.score_state(
-                self.game.get_score(),
-                self.get_knowledge_count() + knowledge_increase,
-                self.game.hints,
-                self.game.fails,
-            )
-        elif isinstance(move, DiscardMove):
-            return self.score_state(
-                self.game.get_score(),
-                self.get_knowledge_count(),
-                self.game.hints + 1,
-                self.game.fails,
-            )
-        else:
-            self.game.assert_(False)
+            if hints < 8:
+                score = self.score_state(game_score, knowledge_count, hints + 1, fails)
+                if score > best_score:
+                    best_move = (DiscardMove, card)
+                    best_score = score
+
+        if hints > 0:
+            for p in game.players:
+                for suit in game.suits:
+                    if p.suit_mask >> SUIT_INDEXES[suit] & 1:
+                        score = self.score_state(
+                            game_score,
+                            knowledge_count + p.unknown_suits[suit],
+                            hints,
+                            fails,
+                        )
+                        if score > best_score:
+                            best_move = (HintMove, (p, Hint.TYPE_SUIT, suit))
+                            best_score = score
+                for number in range(1, game.MAX_NUMBER):
+                    if p.number_mask >> number & 1:
+                        score = self.score_state(
+                            game_score,
+                            knowledge_count + p.unknown_numbers[number],
+                            hints,
+                            fails,
+                        )
+                        if score > best_score:
+                            best_move = (HintMove, (p, Hint.TYPE_NUMBER, number))
+                            best_score = score
+
+        move_class, arg = best_move
+        if move_class is HintMove:
+            arg = Hint(*arg, game)
+        self.execute(move_class(arg))
+
+    def get_play_odds(self, hinted_suit, hinted_number):
+        """Chance that a card with this knowledge is playable, fails, and is a playable
+        5, over the cards that have not left the game"""
+        possible_count, playable_count, playable_five_count = (
+            self.game.get_card_possibilities().get(hinted_suit, hinted_number)
+        )
+        avg_score_increase = round(playable_count / possible_count, 4)
+        avg_fail_increase = round(1 - avg_score_increase, 4)
+        avg_hint_increase = round(playable_five_count / possible_count, 4)
+        return avg_score_increase, avg_fail_increase, avg_hint_increase
 
     def execute(self, move):
         if isinstance(move, PlayMove):
             self.hand.remove(move.card)
+            self.update_hand_state()
             self.game.play_card(move.card)
             self.game.draw(self)
         elif isinstance(move, HintMove):
             self.game.give_hint(move.hint)
         elif isinstance(move, DiscardMove):
             self.hand.remove(move.card)
+            self.update_hand_state()
             self.game.discard_card(move.card)
             self.game.draw(self)
         else:
             self.game.assert_(False)
 
     def get_knowledge_count(self):
-        knowledge_count = 0
-        for p in self.game.players:
-            for c in p.get_hand():
-                if c.hinted_suit:
-                    knowledge_count += 1
-                if c.hinted_number:
-                    knowledge_count += 1
-        return knowledge_count
+        return sum(p.knowledge_count for p in self.game.players)
 
     def score_state(self, game_score, knowledge_count, hints, fails):
         return (
@@ -152,11 +170,12 @@ class InfoPlayer(Player):
 
 
 class Move:
-    def __init__(self):
-        pass
+    __slots__ = ()
 
 
-class PlayMove:
+class PlayMove(Move):
+    __slots__ = ("card",)
+
     def __init__(self, card):
         self.card = card
 
@@ -164,7 +183,9 @@ class PlayMove:
         return "Move: Play {}".format(self.card)
 
 
-class HintMove:
+class HintMove(Move):
+    __slots__ = ("hint",)
+
     def __init__(self, hint):
         self.hint = hint
 
@@ -172,7 +193,9 @@ class HintMove:
         return "Move: Hint {}".format(self.hint)
 
 
-class DiscardMove:
+class DiscardMove(Move):
+    __slots__ = ("card",)
+
     def __init__(self, card):
         self.card = card
 
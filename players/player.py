@@ -19,6 +19,25 @@ class Player:
     def _add_card(self, card):
         pass
 
+    def fork(self, game, cards):
+        """Called by Game.fork to copy the player into the forked game. cards maps
+        every card in a hand to its copy in the fork. Strategies with mutable state
+        must copy it here, so the fork can't change the original."""
+        player = object.__new__(type(self))
+        player.__dict__.update(self.__dict__)
+        player.game = game
+        return player
+
+    def subscribe(self, events):
+        """Called by Game once the player is in the game, or in a fork of it, to
+        subscribe to the events.EventBus of the game's events"""
+        pass
+
+    def reset(self):
+        """Called by Game.reset before the player is dealt a new game. Strategies with
+        mutable state must clear it here, in place where they can."""
+        pass
+
     def get_hand(self):
         """Called by Game and other players to see the cards a player has"""
         pass
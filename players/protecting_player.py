@@ -1,6 +1,7 @@
 from collections import defaultdict
 
 from cards import Hint
+from events import EVENT_DISCARD, EVENT_MISPLAY, EVENT_PLAY, EVENT_SUIT_COMPLETED
 from numpy.core.fromnumeric import sort
 
 from click.decorators import group
@@ -19,10 +20,46 @@ class ProtectingPlayer(SortBasePlayer):
 
     PURPOSE_ENDANGERED = "PURPOSE_ENDANGERED"
 
+    def __init__(self, game, player_number, weights):
+        super().__init__(game, player_number, weights)
+        self.init_endangered_cards()
+
+    def init_endangered_cards(self):
+        """Frozenset of the endangered numbers of each suit, as in
+        Game.get_endangered_cards, kept up to date from the game's events"""
+        self.endangered_cards = {}
+        for suit in self.game.suits:
+            self.update_endangered_cards(suit)
+
+    def update_endangered_cards(self, suit):
+        needed_number = self.game.get_needed_numbers().get(suit)
+        self.endangered_cards[suit] = frozenset(
+            number
+            for number, count in self.game.get_remaining_cards()[suit].items()
+            if count == 1 and needed_number and number > needed_number
+        )
+
+    def on_card_removed(self, card):
+        self.update_endangered_cards(card.suit)
+
+    def subscribe(self, events):
+        super().subscribe(events)
+        for event in (EVENT_PLAY, EVENT_MISPLAY, EVENT_DISCARD):
+            events.subscribe(event, self.on_card_removed)
+
+    def fork(self, game, cards):
+        player = super().fork(game, cards)
+        player.endangered_cards = self.endangered_cards.copy()
+        return player
+
+    def reset(self):
+        super().reset()
+        self.init_endangered_cards()
+
     def find_hints(self, players):
         hints = super().find_hints(players)
         needed_numbers = self.game.get_needed_numbers()
-        endangered_cards = self.game.get_endangered_cards()
+        endangered_cards = self.endangered_cards
 
         for p in players:
             if p == self:
@@ -52,7 +89,7 @@ class ProtectingPlayer(SortBasePlayer):
 
     def score_hint(self, hint):
         score = super().score_hint(hint)
-        card_proximity = hint.player.discard_queue.index(hint.target_card)
+        card_proximity = hint.player.hand.discard_queue_index(hint.target_card)
 
         if hint.purpose == self.PURPOSE_ENDANGERED:
             if card_proximity == 0:
@@ -73,15 +110,12 @@ class ProtectingPlayer(SortBasePlayer):
             and hint.value not in needed_numbers.values()
             and hint.value > min(needed_numbers.values())
         ):
-            new_discard_queue = [c for c in self.discard_queue if c != target_card]
-            new_discard_queue.append(target_card)
-            self.discard_queue = new_discard_queue
+            self.hand.move_to_back_of_discard_queue(target_card)
         else:
             super().act_on_target(target_card, hint)
 
     def take_action(self):
-        sorted_hints = self.sort_hints(self.find_hints(self.game.players))
-        top_hint = sorted_hints[0] if sorted_hints else None
+        top_hint, _ = self.best_hint(self.find_hints(self.game.players))
 
         if (
             top_hint
@@ -89,17 +123,17 @@ class ProtectingPlayer(SortBasePlayer):
             and top_hint.purpose == self.PURPOSE_ENDANGERED
             and top_hint.player.discard_queue[0] == top_hint.target_card
         ):
-            self.game.give_hint(sorted_hints[0])
+            self.game.give_hint(top_hint)
         elif self.play_queue:
             self.play_from_hand()
-        elif self.game.hints > 0 and sorted_hints:
-            self.game.give_hint(sorted_hints[0])
+        elif self.game.hints > 0 and top_hint:
+            self.game.give_hint(top_hint)
         else:
             self.discard_from_hand()
 
     def adjust_queues(self):
         super().adjust_queues()
-        self.play_queue = list(reversed(self.play_queue))
+        self.hand.reverse_play_queue()
 
     def group_cards(self):
         groups = super().group_cards()
@@ -119,12 +153,13 @@ class ProtectSort1Player(ProtectingPlayer):
     PROTECT_PROXIMITY_OTHER_WEIGHT = -1 * pow(10, 7)
 
     def take_action(self):
-        sorted_hints = self.sort_hints(self.find_hints(self.game.players))
-
         if self.play_queue:
             self.play_from_hand()
-        elif self.game.hints > 0 and sorted_hints:
-            self.game.give_hint(sorted_hints[0])
+            return
+
+        top_hint, _ = self.best_hint(self.find_hints(self.game.players))
+        if self.game.hints > 0 and top_hint:
+            self.game.give_hint(top_hint)
         else:
             self.discard_from_hand()
 
@@ -149,8 +184,7 @@ class ProtectSort3Player(ProtectingPlayer):
     PROTECT_PROXIMITY_OTHER_WEIGHT = -1 * pow(10, 7)
 
     def take_action(self):
-        sorted_hints = self.sort_hints(self.find_hints(self.game.players))
-        top_hint = sorted_hints[0] if sorted_hints else None
+        top_hint, _ = self.best_hint(self.find_hints(self.game.players))
 
         if (
             top_hint
@@ -158,11 +192,11 @@ class ProtectSort3Player(ProtectingPlayer):
             and top_hint.purpose == self.PURPOSE_ENDANGERED
             and top_hint.player.discard_queue[0] == top_hint.target_card
         ):
-            self.game.give_hint(sorted_hints[0])
+            self.game.give_hint(top_hint)
         elif self.play_queue:
             self.play_from_hand()
-        elif self.game.hints > 0 and sorted_hints:
-            self.game.give_hint(sorted_hints[0])
+        elif self.game.hints > 0 and top_hint:
+            self.game.give_hint(top_hint)
         else:
             self.discard_from_hand()
 
@@ -191,13 +225,38 @@ class BorderlineHintPlayer(ProtectingPlayer):
     PROTECT_PROXIMITY_OTHER_WEIGHT = -1 * pow(10, 8)
     BORDERLINE_LIVE_WEIGHT = -1 * pow(10, 9)
 
+    def __init__(self, game, player_number, weights):
+        super().__init__(game, player_number, weights)
+        self.init_dead_suits()
+
+    def init_dead_suits(self):
+        """Suits that have been completed, kept up to date from the game's events"""
+        needed_numbers = self.game.get_needed_numbers()
+        self.dead_suits = {s for s in self.game.suits if s not in needed_numbers}
+
+    def on_suit_completed(self, suit):
+        self.dead_suits.add(suit)
+
+    def subscribe(self, events):
+        super().subscribe(events)
+        events.subscribe(EVENT_SUIT_COMPLETED, self.on_suit_completed)
+
+    def fork(self, game, cards):
+        player = super().fork(game, cards)
+        player.dead_suits = self.dead_suits.copy()
+        return player
+
+    def reset(self):
+        super().reset()
+        self.init_dead_suits()
+
     def find_hints(self, players):
         hints = super().find_hints(players)
 
         needed_numbers = self.game.get_needed_numbers()
         needed_max = max(needed_numbers.values())
         needed_min = min(needed_numbers.values())
-        dead_suits = [s for s in self.game.suits if s not in needed_numbers]
+        dead_suits = self.dead_suits
 
         for p in players:
             if p == self:
@@ -248,9 +307,9 @@ class BorderlineHintPlayer(ProtectingPlayer):
         return score
 
     def take_action(self):
-        sorted_hints = self.sort_hints(self.find_hints(self.game.players))
-        top_hint = sorted_hints[0] if sorted_hints else None
-        top_score = self.score_hint(top_hint) if top_hint else 0
+        top_hint, top_score = self.best_hint(self.find_hints(self.game.players))
+        if not top_hint:
+            top_score = 0
 
         grouped_cards = self.group_cards()
 
@@ -260,7 +319,7 @@ class BorderlineHintPlayer(ProtectingPlayer):
             and top_hint.purpose == self.PURPOSE_ENDANGERED
             and top_hint.player.discard_queue[0] == top_hint.target_card
         ):
-            self.game.give_hint(sorted_hints[0])
+            self.game.give_hint(top_hint)
         elif self.play_queue:
             self.play_from_hand()
         elif (
@@ -273,8 +332,8 @@ class BorderlineHintPlayer(ProtectingPlayer):
             self.discard_from_hand()
         elif self.game.hints < 4 and top_score < 0:
             self.discard_from_hand()
-        elif self.game.hints > 0 and sorted_hints:
-            self.game.give_hint(sorted_hints[0])
+        elif self.game.hints > 0 and top_hint:
+            self.game.give_hint(top_hint)
         elif self.game.hints < 8:
             self.discard_from_hand()
         else:
@@ -1,3 +1,5 @@
+from itertools import chain
+
 from .player import Player
 
 
@@ -13,14 +15,86 @@ def reorder_queue(queue, indexes_to_move_to_front):
     return queue_front + queue_back
 
 
+class QueueHand:
+    """A QueuePlayer's hand: the play queue followed by the discard queue.
+
+    The queues are plain lists that are only changed in place through this class, so
+    players can keep references to them. Iterating the hand doesn't build a list, and
+    membership and position lookups use an index of the hand that is rebuilt lazily
+    after a change."""
+
+    __slots__ = ("play_queue", "discard_queue", "positions")
+
+    def __init__(self):
+        self.play_queue = []
+        self.discard_queue = []
+        self.positions = None
+
+    def __iter__(self):
+        return chain(self.play_queue, self.discard_queue)
+
+    def __len__(self):
+        return len(self.play_queue) + len(self.discard_queue)
+
+    def __contains__(self, card):
+        return card in self.get_positions()
+
+    def get_positions(self):
+        """Dict of card -> position in the hand"""
+        if self.positions is None:
+            self.positions = dict(zip(self, range(len(self))))
+        return self.positions
+
+    def is_in_play_queue(self, card):
+        # The play queue is rarely more than a card or two, so a scan beats indexing
+        return card in self.play_queue
+
+    def discard_queue_index(self, card):
+        return self.get_positions()[card] - len(self.play_queue)
+
+    def replace(self, play_queue, discard_queue):
+        self.play_queue[:] = play_queue
+        self.discard_queue[:] = discard_queue
+        self.positions = None
+
+    def reverse_play_queue(self):
+        self.play_queue.reverse()
+        self.positions = None
+
+    def add(self, card):
+        self.discard_queue.append(card)
+        if self.positions is not None:
+            self.positions[card] = len(self) - 1
+
+    def pop_play_queue(self):
+        self.positions = None
+        return self.play_queue.pop(0)
+
+    def pop_discard_queue(self):
+        self.positions = None
+        return self.discard_queue.pop(0)
+
+    def move_to_play_queue(self, card):
+        self.discard_queue.remove(card)
+        self.play_queue.append(card)
+        self.positions = None
+
+    def move_to_back_of_discard_queue(self, card):
+        self.discard_queue.remove(card)
+        self.discard_queue.append(card)
+        self.positions = None
+
+
 class QueuePlayer(Player):
     """Abstract class for Queue Players, who keep a publicly-visible 'play queue' and
     'discard queue'"""
 
-    def __init__(self, game, player_number):
-        super().__init__(game, player_number)
-        self.play_queue = []
-        self.discard_queue = []
+    def __init__(self, game, player_number, weights):
+        super().__init__(game, player_number, weights)
+        self.hand = QueueHand()
+        # Aliases of the hand's lists, which are only ever changed through self.hand
+        self.play_queue = self.hand.play_queue
+        self.discard_queue = self.hand.discard_queue
 
     def __repr__(self):
         s = super().__repr__()
@@ -32,23 +106,40 @@ class QueuePlayer(Player):
             s += "    - {}\n".format(c)
         return s
 
+    def fork(self, game, cards):
+        player = super().fork(game, cards)
+        player.hand = QueueHand()
+        player.hand.replace(
+            [cards[c] for c in self.play_queue], [cards[c] for c in self.discard_queue]
+        )
+        player.play_queue = player.hand.play_queue
+        player.discard_queue = player.hand.discard_queue
+        return player
+
+    def reset(self):
+        super().reset()
+        self.hand.replace([], [])
+
     def get_hand(self):
-        return self.play_queue + self.discard_queue
+        return self.hand
 
     def _add_card(self, card):
-        self.discard_queue.append(card)
+        self.hand.add(card)
 
     def adjust_queues(self):
         """Adjust what should be played and discarded. Called each turn."""
 
         groups = self.group_cards()
 
-        unknown_to_play = [c for c in groups["unknown"] if c in self.play_queue]
-        unknown_to_discard = [c for c in groups["unknown"] if c in self.discard_queue]
-
-        self.game.assert_(
-            set(groups["unknown"]) == set(unknown_to_discard + unknown_to_play)
-        )
+        # Groups are built from the hand, so a card not in the play queue is in the
+        # discard queue
+        unknown_to_play = []
+        unknown_to_discard = []
+        for c in groups["unknown"]:
+            if self.hand.is_in_play_queue(c):
+                unknown_to_play.append(c)
+            else:
+                unknown_to_discard.append(c)
 
         new_play_queue = unknown_to_play + groups["can_play_now"]
         new_discard_queue = (
@@ -56,18 +147,28 @@ class QueuePlayer(Player):
         )
 
         needed_numbers = self.game.get_needed_numbers()
-        for c in new_play_queue:
-            self.game.assert_(c.hinted_suit or c.hinted_number)
-            if c.hinted_suit:
-                self.game.assert_(c.suit in needed_numbers)
-
-        self.play_queue = sorted(
-            new_play_queue,
-            key=lambda c: c.hinted_number
-            if c.hinted_number
-            else needed_numbers[c.hinted_suit],
+        if self.game.check_invariants:
+            self.game.assert_(
+                len(new_play_queue) + len(new_discard_queue) == len(self.hand)
+            )
+        if self.game.check_expensive:
+            # An unknown card outside the play queue must be in the discard queue
+            for c in unknown_to_discard:
+                self.game.assert_(c in self.discard_queue)
+            for c in new_play_queue:
+                self.game.assert_(c.hinted_suit or c.hinted_number)
+                if c.hinted_suit:
+                    self.game.assert_(c.suit in needed_numbers)
+
+        self.hand.replace(
+            sorted(
+                new_play_queue,
+                key=lambda c: c.hinted_number
+                if c.hinted_number
+                else needed_numbers[c.hinted_suit],
+            ),
+            new_discard_queue,
         )
-        self.discard_queue = new_discard_queue
 
     def group_cards(self):
         can_play_now = []
@@ -84,7 +185,8 @@ class QueuePlayer(Player):
                 elif c.number == needed_numbers[c.suit]:
                     can_play_now.append(c)
                 else:
-                    self.game.assert_(c.number > needed_numbers[c.suit])
+                    if self.game.check_invariants:
+                        self.game.assert_(c.number > needed_numbers[c.suit])
                     can_play_later.append(c)
             elif c.hinted_suit:
                 if c.suit not in needed_numbers:
@@ -136,21 +238,14 @@ class QueuePlayer(Player):
         self.move_to_play_queue(target_card)
 
     def move_to_play_queue(self, target_card):
-        new_play_queue = self.play_queue.copy()
-        new_discard_queue = self.discard_queue.copy()
-
-        new_play_queue.append(target_card)
-        new_discard_queue.remove(target_card)
-
-        self.play_queue = new_play_queue
-        self.discard_queue = new_discard_queue
+        self.hand.move_to_play_queue(target_card)
 
     def play_from_hand(self):
-        card = self.play_queue.pop(0)
+        card = self.hand.pop_play_queue()
         self.game.play_card(card)
         self.game.draw(self)
 
     def discard_from_hand(self):
-        card = self.discard_queue.pop(0)
+        card = self.hand.pop_discard_queue()
         self.game.discard_card(card)
         self.game.draw(self)
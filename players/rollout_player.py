@@ -0,0 +1,190 @@
+import atexit
+import multiprocessing as mp
+import random
+import time
+
+from cards import Hint
+from seeding import derive_seed
+from .basic_queue_player import BasicQueuePlayer
+
+MOVE_POLICY = "POLICY"
+MOVE_PLAY = "PLAY"
+MOVE_DISCARD = "DISCARD"
+MOVE_HINT = "HINT"
+
+# Pools are shared by every RolloutPlayer in the process, one per worker count
+_pools = {}
+
+
+@atexit.register
+def close_pools():
+    """Shuts down the rollout worker pools. Runs at exit, and can be called sooner
+    once no more RolloutPlayer games will be played"""
+    for pool in _pools.values():
+        pool.close()
+        pool.join()
+    _pools.clear()
+
+
+class RolloutPlayer(BasicQueuePlayer):
+    """Monte Carlo player that improves on its policy, BasicQueuePlayer: it keeps the
+    same queues and reads hints the same way, but picks each move by the mean final
+    score of games played out from it.
+
+    A rollout determinizes a fork of the game (the player's own hand and the deck are
+    dealt again, consistently with its hint knowledge, see Game.redeal_hidden_cards),
+    makes the move, then every player, queues included, plays on as the policy. All
+    moves are tried on the same determinizations, so they are compared on equal
+    terms. Weights configure it:
+      - ROLLOUTS: determinizations per turn (each plays out every move)
+      - ROLLOUT_WORKERS: processes the determinizations are spread over. Their pools
+        are shared by the process, and closed at exit or by close_pools
+      - ROLLOUT_TIME_BUDGET_MS: time budget per move; the turn stops starting new
+        determinizations after budget * number of moves. Results then depend on
+        timing, so it is off by default.
+
+    Determinizations no deal could make agree with the hints are skipped, and counted
+    in skipped_rollouts for the game.
+    """
+
+    POLICY = BasicQueuePlayer
+    ROLLOUTS = 8
+    ROLLOUT_WORKERS = 1
+    ROLLOUT_TIME_BUDGET_MS = 0
+
+    def __init__(self, game, player_number, weights):
+        super().__init__(game, player_number, weights)
+        self.skipped_rollouts = 0
+
+    def reset(self):
+        super().reset()
+        self.skipped_rollouts = 0
+
+    def get_setting(self, name):
+        return (self.weights or {}).get(name) or getattr(self, name)
+
+    def take_action(self):
+        moves = self.get_moves()
+        if len(moves) > 1:
+            totals = self.score_moves(moves)
+            move = moves[max(range(len(moves)), key=totals.__getitem__)]
+        else:
+            move = moves[0]
+        execute_move(self, move, self.POLICY)
+
+    def get_moves(self):
+        """Moves worth rolling out, as picklable tuples: whatever the policy would do,
+        playing from the play queue, the hints the policy would consider, and
+        discarding from the discard queue"""
+        game = self.game
+        moves = [(MOVE_POLICY,)]
+        if self.play_queue:
+            moves.append((MOVE_PLAY,))
+        if game.hints > 0:
+            moves += [
+                (MOVE_HINT, h.player.player_number, h.type, h.value)
+                for h in self.find_hints(game.players)
+            ]
+        if self.discard_queue and game.hints < 8:
+            moves.append((MOVE_DISCARD,))
+        return moves
+
+    def could_be(self, card, suit, number):
+        """Whether a card in the hand could have suit and number, beyond its hint
+        knowledge: teammates only hint cards into the play queue when they are
+        playable"""
+        if self.hand.is_in_play_queue(card):
+            return self.game.get_needed_numbers().get(suit) == number
+        return True
+
+    def score_moves(self, moves):
+        """Total rollout score of each move"""
+        rollouts = int(self.get_setting("ROLLOUTS"))
+        workers = min(int(self.get_setting("ROLLOUT_WORKERS")), rollouts)
+        budget = self.get_setting("ROLLOUT_TIME_BUDGET_MS") * len(moves) / 1000
+        turn_seed = derive_seed(self.game.seed, self.game.current_turn)
+        # Logging, tracing and the original cards stay out of the rollouts
+        game = self.game.fork()
+
+        tasks = [
+            (
+                game,
+                self.player_number,
+                moves,
+                self.POLICY,
+                turn_seed,
+                range(w, rollouts, workers),
+                budget,
+            )
+            for w in range(workers)
+        ]
+        # Pools can't be nested, e.g. when main.py already runs games in workers
+        if workers > 1 and not mp.current_process().daemon:
+            if workers not in _pools:
+                _pools[workers] = mp.Pool(workers)
+            results = _pools[workers].map(run_rollouts, tasks)
+        else:
+            results = [run_rollouts(task) for task in tasks]
+
+        skipped = sum(skipped for _, skipped in results)
+        if skipped:
+            self.skipped_rollouts += skipped
+            self.game.log(
+                "Skipped {} of {} rollouts: no deal agreed with the hints",
+                skipped,
+                rollouts,
+            )
+        return [sum(totals) for totals in zip(*(totals for totals, _ in results))]
+
+
+def execute_move(player, move, policy):
+    game = player.game
+    if move[0] == MOVE_POLICY:
+        policy.take_action(player)
+    elif move[0] == MOVE_PLAY:
+        player.play_from_hand()
+    elif move[0] == MOVE_DISCARD:
+        player.discard_from_hand()
+    else:
+        _, player_number, hint_type, value = move
+        game.give_hint(Hint(game.players[player_number], hint_type, value, game))
+
+
+def run_rollouts(args):
+    """Plays every move on the determinizations with the given indexes, and returns
+    the total final score of each move and how many determinizations were skipped.
+    Also the pool entry point.
+
+    Determinization k is seeded from the turn seed and k alone, so the totals don't
+    depend on how determinizations are split between workers. Once budget seconds
+    have passed, no new determinization is started."""
+    game, player_number, moves, policy, turn_seed, indexes, budget = args
+    deadline = time.perf_counter() + budget
+    totals = [0] * len(moves)
+    skipped = 0
+    for k in indexes:
+        if budget and k != indexes[0] and time.perf_counter() > deadline:
+            break
+        determinized = game.fork()
+        rng = random.Random(derive_seed(turn_seed, k))
+        # If a few deals can't agree with could_be, fall back on the hints alone. In
+        # the very rare case that fails too, the determinization is skipped: keeping
+        # the real cards would let the player see its own hand
+        player = determinized.players[player_number]
+        if not any(
+            determinized.redeal_hidden_cards(player, rng, player.could_be)
+            for _ in range(3)
+        ) and not any(determinized.redeal_hidden_cards(player, rng) for _ in range(3)):
+            skipped += 1
+            continue
+        # Players only differ from the policy in how they pick moves, so they can
+        # switch class in place, like profiling.profiled_game_class does
+        for p in determinized.players:
+            p.__class__ = policy
+
+        for i, move in enumerate(moves):
+            rollout = determinized.fork()
+            execute_move(rollout.players[player_number], move, policy)
+            rollout.end_turn()
+            totals[i] += rollout.run_game()
+    return totals, skipped
@@ -0,0 +1,94 @@
+class CardPossibilityIndex:
+    """Counts of the cards that have not left the game (played or discarded), for
+    every combination of known suit and known number, where None means unknown.
+
+    Alongside each count it keeps how many of those cards are playable right now and
+    how many are playable 5s, so the chance that a card with some hint knowledge is
+    playable is a dict lookup. Game keeps it up to date as cards are played and
+    discarded; get it from Game.get_card_possibilities.
+    """
+
+    # Index of a full deck for each set of suits, copied by for_new_game
+    new_game_indexes = {}
+
+    def __init__(self, suits, number_counts):
+        self.needed_numbers = {s: 1 for s in suits}
+        self.counts = {}
+        self.playable_counts = {}
+        self.playable_five_counts = {}
+        for key in self.get_keys(None, None):
+            self.init_key(key)
+        for suit in suits:
+            for number, count in number_counts.items():
+                for key in self.get_keys(suit, number):
+                    self.init_key(key)
+                    self.counts[key] += count
+                    if number == 1:
+                        self.playable_counts[key] += count
+
+    @classmethod
+    def for_new_game(cls, suits, number_counts):
+        """Index of a full deck. Building one takes far longer than copying it, so it
+        is only built once per set of suits"""
+        key = (tuple(suits), tuple(number_counts.items()))
+        if key not in cls.new_game_indexes:
+            cls.new_game_indexes[key] = cls(suits, number_counts)
+        return cls.new_game_indexes[key].copy()
+
+    def copy(self):
+        index = CardPossibilityIndex.__new__(CardPossibilityIndex)
+        index.needed_numbers = self.needed_numbers.copy()
+        index.counts = self.counts.copy()
+        index.playable_counts = self.playable_counts.copy()
+        index.playable_five_counts = self.playable_five_counts.copy()
+        return index
+
+    def init_key(self, key):
+        self.counts.setdefault(key, 0)
+        self.playable_counts.setdefault(key, 0)
+        self.playable_five_counts.setdefault(key, 0)
+
+    def get_keys(self, suit, number):
+        """Every (hinted suit, hinted number) that a card of suit and number could show"""
+        return ((suit, number), (suit, None), (None, number), (None, None))
+
+    def remove_card(self, suit, number):
+        """Called when a card leaves the game, before its suit advances if it is played"""
+        is_playable = self.needed_numbers.get(suit) == number
+        for key in self.get_keys(suit, number):
+            self.counts[key] -= 1
+            if is_playable:
+                self.playable_counts[key] -= 1
+                if number == 5:
+                    self.playable_five_counts[key] -= 1
+
+    def advance_suit(self, suit, played_number):
+        """Called when played_number is played on suit, so the next number becomes the
+        playable one"""
+        self.add_playable(suit, played_number, -1)
+        if played_number == 5:
+            del self.needed_numbers[suit]
+        else:
+            self.needed_numbers[suit] = played_number + 1
+            self.add_playable(suit, played_number + 1, 1)
+
+    def add_playable(self, suit, number, sign):
+        count = sign * self.counts[(suit, number)]
+        for key in self.get_keys(suit, number):
+            self.playable_counts[key] += count
+            if number == 5:
+                self.playable_five_counts[key] += count
+
+    def get(self, hinted_suit, hinted_number):
+        """Returns (possible, playable, playable 5s) counts for a card with the given
+        hint knowledge"""
+        key = (hinted_suit, hinted_number)
+        return (
+            self.counts[key],
+            self.playable_counts[key],
+            self.playable_five_counts[key],
+        )
+
+    def get_play_probability(self, hinted_suit, hinted_number):
+        possible, playable, _ = self.get(hinted_suit, hinted_number)
+        return playable / possible if possible else 0
@@ -0,0 +1,127 @@
+from collections import defaultdict
+from contextlib import contextmanager
+import time
+
+from tabulate import tabulate
+
+# Phases of a turn, wrapped on whichever player classes define them
+PLAYER_PHASES = (
+    "take_turn",
+    "adjust_queues",
+    "group_cards",
+    "find_hints",
+    "sort_hints",
+    "best_hint",
+    "score_hint",
+    "take_action",
+    "receive_hint",
+)
+
+# Game calls made by strategies
+GAME_CALLS = (
+    "play_card",
+    "discard_card",
+    "give_hint",
+    "draw",
+    "get_needed_numbers",
+    "get_endangered_cards",
+    "get_remaining_cards",
+    "get_remaining_card_list",
+    "get_card_possibilities",
+)
+
+
+class PhaseProfile:
+    """Call counts and cumulative time per phase. Time includes nested phases, e.g.
+    take_turn includes find_hints, and receive_hint includes the adjust_queues it
+    runs."""
+
+    def __init__(self):
+        self.calls = defaultdict(int)
+        self.times = defaultdict(float)
+        self.profiled_classes = {}
+        self.paused = False
+
+    def record(self, name, elapsed):
+        if self.paused:
+            return
+        self.calls[name] += 1
+        self.times[name] += elapsed
+
+    @contextmanager
+    def pause(self):
+        """Calls made inside aren't recorded"""
+        self.paused = True
+        try:
+            yield
+        finally:
+            self.paused = False
+
+    def merge(self, other):
+        for name, calls in other.calls.items():
+            self.calls[name] += calls
+            self.times[name] += other.times[name]
+
+    def format(self, title=None):
+        turn_time = self.times.get("take_turn") or 1
+        rows = [
+            [
+                name,
+                self.calls[name],
+                round(self.times[name], 3),
+                round(self.times[name] / self.calls[name] * 1e6, 2),
+                round(100 * self.times[name] / turn_time, 1),
+            ]
+            for name in sorted(self.times, key=self.times.get, reverse=True)
+        ]
+        table = tabulate(
+            rows,
+            headers=["Phase", "Calls", "Total (s)", "Per call (us)", "% of turns"],
+            tablefmt="pretty",
+        )
+        return (title + "\n" if title else "") + table + "\n"
+
+    def profiled_class(self, cls, names, prefix=""):
+        """Subclass of cls whose methods in names record into this profile. The
+        original classes are untouched, so there's no cost when profiling is off"""
+        if cls not in self.profiled_classes:
+            methods = {
+                name: self.timed(getattr(cls, name), prefix + name)
+                for name in names
+                if hasattr(cls, name)
+            }
+            self.profiled_classes[cls] = type(
+                "Profiled" + cls.__name__, (cls,), methods
+            )
+        return self.profiled_classes[cls]
+
+    def timed(self, method, name):
+        def timed_method(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+
+        timed_method.__name__ = method.__name__
+        timed_method.__doc__ = method.__doc__
+        return timed_method
+
+
+def profiled_game_class(game_class, profile):
+    """game_class with its strategy calls and its players' turn phases recorded in
+    profile"""
+    game_class = profile.profiled_class(game_class, GAME_CALLS, "Game.")
+
+    class ProfiledGame(game_class):
+        def init_players(self, num_players, strategy):
+            super().init_players(num_players, strategy)
+            for p in self.players:
+                p.__class__ = profile.profiled_class(type(p), PLAYER_PHASES)
+
+        def deal(self):
+            # The game draws the hands, not the strategies
+            with profile.pause():
+                super().deal()
+
+    return ProfiledGame
@@ -0,0 +1,165 @@
+import ast
+from functools import lru_cache
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import sqlite3
+import sys
+
+import players
+from players import STRATEGIES
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIRS = (REPO_DIR, os.path.join(REPO_DIR, "players"))
+
+
+class ResultStore:
+    """SQLite store of per-game outcomes, so runs only play the seeds they haven't
+    played before.
+
+    Outcomes are keyed by a configuration (engine, strategy, number of players,
+    rainbow, weights and a fingerprint of the code that decides the outcome, see
+    code_fingerprint) and the game's seed. An outcome is (score, wasted discards,
+    turns)."""
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS configs (
+                id INTEGER PRIMARY KEY,
+                key TEXT UNIQUE NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS games (
+                config_id INTEGER NOT NULL,
+                seed INTEGER NOT NULL,
+                score INTEGER NOT NULL,
+                wasted_discards INTEGER NOT NULL,
+                turns INTEGER NOT NULL,
+                PRIMARY KEY (config_id, seed)
+            ) WITHOUT ROWID;
+            """)
+        self.config_ids = {}
+
+    def close(self):
+        self.connection.close()
+
+    def config_key(
+        self,
+        game_class,
+        strategy,
+        num_players,
+        use_rainbow,
+        weights,
+        validation=None,
+        validation_sample=None,
+    ):
+        # Strategies read missing weights as 0, so zero weights are left out.
+        # Validation only checks games, it doesn't change their outcomes
+        return json.dumps(
+            {
+                "engine": game_class.__name__,
+                "strategy": strategy,
+                "num_players": num_players,
+                "use_rainbow": use_rainbow,
+                "weights": sorted((k, v) for k, v in weights.items() if v),
+                "code": code_fingerprint(game_class, strategy),
+            },
+            sort_keys=True,
+        )
+
+    def get_config_id(self, config):
+        if config not in self.config_ids:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT OR IGNORE INTO configs (key) VALUES (?)", (config,)
+                )
+            (self.config_ids[config],) = self.connection.execute(
+                "SELECT id FROM configs WHERE key = ?", (config,)
+            ).fetchone()
+        return self.config_ids[config]
+
+    def load(self, config, seeds):
+        """Dict of seed -> outcome, for the seeds that have a stored outcome"""
+        config_id = self.get_config_id(config)
+        # The seeds go through a temporary table, so SQLite only reads their rows
+        with self.connection:
+            self.connection.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS wanted_seeds (seed INTEGER PRIMARY KEY)"
+            )
+            self.connection.execute("DELETE FROM wanted_seeds")
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO wanted_seeds VALUES (?)",
+                ((seed,) for seed in seeds),
+            )
+            rows = self.connection.execute(
+                """
+                SELECT games.seed, score, wasted_discards, turns
+                FROM wanted_seeds JOIN games ON games.seed = wanted_seeds.seed
+                WHERE games.config_id = ?
+                """,
+                (config_id,),
+            ).fetchall()
+        return {seed: tuple(outcome) for seed, *outcome in rows}
+
+    def save(self, config, outcomes):
+        """Stores (seed, score, wasted discards, turns) rows"""
+        config_id = self.get_config_id(config)
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?)",
+                ((config_id, *outcome) for outcome in outcomes),
+            )
+
+
+@lru_cache(maxsize=None)
+def code_fingerprint(game_class, strategy):
+    """Hash of the source files of the game engine and the strategy's classes, so
+    outcomes stored before a change to either are not reused"""
+    digest = hashlib.sha256()
+    modules = engine_modules(game_class, strategy)
+    for path in sorted(inspect.getsourcefile(m) for m in modules):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def engine_modules(game_class, strategy):
+    """The modules of the engine's and the strategy's classes, and every module of
+    this repo they import, directly or indirectly. The players package only
+    registers strategies, so its imports aren't followed: other strategies would
+    change every strategy's fingerprint"""
+    modules = set()
+    pending = [
+        inspect.getmodule(c)
+        for c in game_class.__mro__[:-1] + STRATEGIES[strategy].__mro__[:-1]
+    ]
+    while pending:
+        module = pending.pop()
+        if module in modules or module is players or not is_repo_module(module):
+            continue
+        modules.add(module)
+        pending.extend(imported_modules(module))
+    return modules
+
+
+def imported_modules(module):
+    """Modules imported by module's import statements"""
+    names = []
+    for node in ast.walk(ast.parse(inspect.getsource(module))):
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = importlib.util.resolve_name(
+                "." * node.level + (node.module or ""), module.__package__
+            )
+            names.append(base)
+            # from package import module
+            names.extend(base + "." + alias.name for alias in node.names)
+    return [sys.modules[name] for name in names if name in sys.modules]
+
+
+def is_repo_module(module):
+    path = getattr(module, "__file__", None)
+    return bool(path) and os.path.dirname(os.path.abspath(path)) in REPO_DIRS
@@ -0,0 +1,180 @@
+from collections import defaultdict
+from math import ceil
+
+import click
+
+PARAM_RANGE = 5
+SEARCH_INTERVAL = 1
+
+
+class Search:
+    """Base class for weight optimizers. All of them score candidates through a shared
+    evaluation.WeightEvaluator, so they get its worker pool, common random numbers
+    and memoized scores. run returns (best score, best weights)."""
+
+    def __init__(self, evaluator, params, rng, population=16, generations=10):
+        self.evaluator = evaluator
+        self.params = params
+        self.rng = rng
+        self.population = population
+        self.generations = generations
+
+    def run(self):
+        """Searches the weights, and returns (best score, best weights)"""
+        pass
+
+    def midpoint(self):
+        weights = defaultdict(float)
+        for p in self.params:
+            weights[p] = PARAM_RANGE / 2
+        return weights
+
+    def random_weights(self):
+        weights = defaultdict(float)
+        for p in self.params:
+            weights[p] = self.rng.uniform(0, PARAM_RANGE)
+        return weights
+
+    def echo(self, weights, score, note=""):
+        click.echo(
+            "Weights {} score {}{}".format(
+                {p: round(w, 3) for p, w in weights.items()}, score, note
+            )
+        )
+
+
+class HillClimbSearch(Search):
+    """Coordinate hill climbing: moves SEARCH_INTERVAL along one parameter at a time,
+    as long as some neighbor beats the current weights"""
+
+    def run(self):
+        best_weights = self.midpoint()
+        best_score, _ = self.evaluator.evaluate([best_weights])[0]
+        self.echo(best_weights, best_score, " (start)")
+
+        while True:
+            neighbor_weights = []
+            for p in self.params:
+                for step in (SEARCH_INTERVAL, -SEARCH_INTERVAL):
+                    new_weights = best_weights.copy()
+                    new_weights[p] += step
+                    neighbor_weights.append(new_weights)
+
+            new_best_score = best_score
+            new_best_weights = None
+            results = self.evaluator.evaluate(neighbor_weights, incumbent=best_weights)
+            for w, (score, complete) in zip(neighbor_weights, results):
+                self.echo(w, score, "" if complete else " (stopped early)")
+                if complete and score > new_best_score:
+                    new_best_score = score
+                    new_best_weights = w
+
+            if new_best_weights is None:
+                return best_score, best_weights
+            best_score = new_best_score
+            best_weights = new_best_weights
+
+
+class CrossEntropySearch(Search):
+    """Population search: each generation samples candidates from a normal
+    distribution per parameter, then refits the distribution to the elite ones"""
+
+    ELITE_FRACTION = 0.25
+    SMOOTHING = 0.7
+    MIN_STD = 0.05
+
+    def run(self):
+        means = {p: PARAM_RANGE / 2 for p in self.params}
+        stds = {p: PARAM_RANGE / 4 for p in self.params}
+        best_weights = self.midpoint()
+        best_score, _ = self.evaluator.evaluate([best_weights])[0]
+
+        for generation in range(self.generations):
+            candidates = []
+            for _ in range(self.population):
+                weights = defaultdict(float)
+                for p in self.params:
+                    # Kept in the range the other optimizers search
+                    weight = self.rng.gauss(means[p], stds[p])
+                    weights[p] = min(max(weight, 0), PARAM_RANGE)
+                candidates.append(weights)
+
+            # The whole generation is evaluated at once, so it fills the pool
+            results = self.evaluator.evaluate(candidates, incumbent=best_weights)
+            ranked = sorted(
+                zip(candidates, results),
+                key=lambda r: (r[1][1], r[1][0]),
+                reverse=True,
+            )
+            for w, (score, complete) in ranked:
+                if complete and score > best_score:
+                    best_score = score
+                    best_weights = w
+
+            elite = [
+                w for w, _ in ranked[: max(2, int(len(ranked) * self.ELITE_FRACTION))]
+            ]
+            for p in self.params:
+                values = [w[p] for w in elite]
+                mean = sum(values) / len(values)
+                std = (sum((v - mean) ** 2 for v in values) / len(values)) ** 0.5
+                means[p] = self.SMOOTHING * mean + (1 - self.SMOOTHING) * means[p]
+                stds[p] = max(
+                    self.SMOOTHING * std + (1 - self.SMOOTHING) * stds[p],
+                    self.MIN_STD,
+                )
+
+            click.echo("Generation {}".format(generation))
+            self.echo(best_weights, best_score, " (best so far)")
+
+        return best_score, best_weights
+
+
+class SuccessiveHalvingSearch(Search):
+    """Plays random candidates on a small seed budget, keeps the better half and
+    doubles the budget until one candidate is left or every seed is played"""
+
+    def run(self):
+        candidates = [self.random_weights() for _ in range(self.population)]
+        budget = self.evaluator.round_size
+
+        while True:
+            budget = min(budget, self.evaluator.trials)
+            results = self.evaluator.evaluate(candidates, trials=budget)
+            ranked = sorted(
+                zip(candidates, results), key=lambda r: r[1][0], reverse=True
+            )
+            click.echo("{} candidates on {} seeds".format(len(candidates), budget))
+            if len(candidates) == 1 or budget == self.evaluator.trials:
+                best_weights, (best_score, _) = ranked[0]
+                return best_score, best_weights
+
+            candidates = [w for w, _ in ranked[: ceil(len(ranked) / 2)]]
+            budget *= 2
+
+
+class RacingSearch(Search):
+    """Races random candidates: every round plays more seeds for the candidates
+    still in the race, and drops the ones clearly worse than the leader"""
+
+    def run(self):
+        candidates = [self.random_weights() for _ in range(self.population)]
+        results = self.evaluator.race(candidates)
+
+        best_score = None
+        best_weights = None
+        for w, (score, survived) in zip(candidates, results):
+            if survived:
+                self.echo(w, score)
+                if best_score is None or score > best_score:
+                    best_score = score
+                    best_weights = w
+        return best_score, best_weights
+
+
+OPTIMIZERS = {
+    "hill-climb": HillClimbSearch,
+    "cross-entropy": CrossEntropySearch,
+    "successive-halving": SuccessiveHalvingSearch,
+    "racing": RacingSearch,
+}
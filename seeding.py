@@ -0,0 +1,14 @@
+import sys
+
+MASK_64 = (1 << 64) - 1
+
+
+def derive_seed(master_seed, game_index):
+    """Mixes the master seed and game index with splitmix64, so any game's seed can be
+    computed on its own without replaying the ones before it"""
+    z = (master_seed + (game_index + 1) * 0x9E3779B97F4A7C15) & MASK_64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK_64
+    z ^= z >> 31
+    # Game treats a seed of 0 as "no seed", so keep derived seeds positive
+    return z % (sys.maxsize - 1) + 1
@@ -0,0 +1,117 @@
+from math import floor, inf, sqrt
+
+
+class ScoreAccumulator:
+    """Streaming summary of simulation results.
+
+    Scores are small integers, so a histogram plus running sums gives exact means,
+    percentiles and std in constant memory, however many games are played.
+    Accumulators from different chunks/workers can be merged. Every statistic is 0
+    before the first game, e.g. for a run of 0 games."""
+
+    def __init__(self, perfect_score):
+        self.perfect_score = perfect_score
+        self.histogram = [0] * (perfect_score + 1)
+        self.count = 0
+        self.score_sum = 0
+        self.score_square_sum = 0
+        self.wasted_discard_pct_sum = 0.0
+
+    def add(self, score, wasted_discard_pct):
+        self.histogram[score] += 1
+        self.count += 1
+        self.score_sum += score
+        self.score_square_sum += score * score
+        self.wasted_discard_pct_sum += wasted_discard_pct
+
+    def merge(self, other):
+        for score, count in enumerate(other.histogram):
+            self.histogram[score] += count
+        self.count += other.count
+        self.score_sum += other.score_sum
+        self.score_square_sum += other.score_square_sum
+        self.wasted_discard_pct_sum += other.wasted_discard_pct_sum
+
+    def mean(self):
+        if not self.count:
+            return 0
+        return self.score_sum / self.count
+
+    def std(self):
+        """Population standard deviation, same as numpy.std"""
+        if not self.count:
+            return 0
+        # Sums are exact integers, so only the final division rounds
+        variance = self.count * self.score_square_sum - self.score_sum**2
+        return sqrt(variance / (self.count * self.count))
+
+    def percentile(self, p):
+        """Same result as numpy.percentile with the default linear method"""
+        if not self.count:
+            return 0
+        rank = (self.count - 1) * (p / 100)
+        lower_rank = floor(rank)
+        lower = self.nth_score(lower_rank)
+        upper = self.nth_score(min(lower_rank + 1, self.count - 1))
+        t = rank - lower_rank
+        # Interpolate the way numpy does, so results match to the last bit
+        if t >= 0.5:
+            return upper - (upper - lower) * (1 - t)
+        return lower + (upper - lower) * t
+
+    def nth_score(self, n):
+        """The score at index n of the sorted scores"""
+        seen = 0
+        for score, count in enumerate(self.histogram):
+            seen += count
+            if seen > n:
+                return score
+
+    def perfect_pct(self):
+        if not self.count:
+            return 0
+        return self.histogram[self.perfect_score] / self.count * 100
+
+    def wasted_discard_pct(self):
+        if not self.count:
+            return 0
+        return self.wasted_discard_pct_sum / self.count * 100
+
+
+class PairedDifference:
+    """Streaming mean and confidence interval of paired score differences, i.e. the
+    score of one strategy minus another's on the same seed. Pairing cancels out how
+    good the deck was, so far fewer games are needed than comparing two means."""
+
+    def __init__(self):
+        self.count = 0
+        self.diff_sum = 0
+        self.diff_square_sum = 0
+
+    def add(self, diff):
+        self.count += 1
+        self.diff_sum += diff
+        self.diff_square_sum += diff * diff
+
+    def mean(self):
+        if not self.count:
+            return 0
+        return self.diff_sum / self.count
+
+    def std(self):
+        """Sample standard deviation, same as numpy.std with ddof=1"""
+        # Sums are exact integers, so only the final division rounds
+        variance = self.count * self.diff_square_sum - self.diff_sum**2
+        return sqrt(variance / (self.count * (self.count - 1)))
+
+    def interval(self, z):
+        """Mean difference +- z standard errors. Infinite before two games"""
+        if self.count < 2:
+            return -inf, inf
+        half_width = z * self.std() / sqrt(self.count)
+        return self.mean() - half_width, self.mean() + half_width
+
+    def is_settled(self, z):
+        """Whether the interval excludes 0, so one strategy is better"""
+        low, high = self.interval(z)
+        return low > 0 or high < 0
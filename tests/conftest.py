@@ -0,0 +1,34 @@
+from collections import defaultdict
+import os
+import sys
+
+# The modules live at the top of the repo, which isn't a package pytest can import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Weights for the strategies that score moves with them, e.g. INFO
+WEIGHTS = defaultdict(int, GAME_SCORE=1, HINTS=0.3, KNOWLEDGE_COUNT=0.2, FAILS=-1)
+
+
+def outcome(game):
+    """Plays the rest of game and returns what it ended with"""
+    score = game.run_game()
+    return (score, game.wasted_discards, game.current_turn, game.hints, game.fails)
+
+
+def game_turns(game):
+    """Plays game turn by turn, as run_game does, yielding after every turn"""
+    while (
+        game.fails < 3
+        and game.turn_timer >= 0
+        and game.get_score() < 5 * len(game.suits)
+    ):
+        game.players[game.current_player].take_turn()
+        game.end_turn()
+        yield
+
+
+def play_turns(game, turns):
+    """Plays the next turns of game, which mustn't end before them"""
+    for _ in range(turns):
+        game.players[game.current_player].take_turn()
+        game.end_turn()
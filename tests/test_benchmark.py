@@ -0,0 +1,53 @@
+import json
+
+from click.testing import CliRunner
+
+from benchmark import config_name, find_regressions, run_benchmarks
+
+RESULT = {"games_per_sec": 100.0, "p99_turn_us": 50.0, "peak_memory_kb": 200.0}
+
+
+def test_find_regressions_reports_only_worse_metrics():
+    worse = dict(RESULT, games_per_sec=50.0, peak_memory_kb=400.0)
+    slightly_worse = dict(RESULT, p99_turn_us=70.0)
+    regressions = find_regressions(
+        {"equal": RESULT, "worse": RESULT, "slightly worse": RESULT},
+        {
+            "equal": RESULT,
+            "worse": worse,
+            "slightly worse": slightly_worse,
+            "new": worse,
+        },
+        1.5,
+    )
+    assert regressions == [
+        ("worse", "games_per_sec", 2.0),
+        ("worse", "peak_memory_kb", 2.0),
+    ]
+
+
+def test_regressions_are_reported_and_fail_the_run(tmp_path):
+    baseline = str(tmp_path / "baseline.json")
+    args = ["-s", "FIRST_CARD", "-n", "2", "-g", "3"]
+    result = CliRunner().invoke(run_benchmarks, args + ["-o", baseline])
+    assert result.exit_code == 0
+
+    # A baseline far faster than any run for one configuration, and far slower for
+    # the other, so timing noise can't change which one regresses
+    with open(baseline) as f:
+        data = json.load(f)
+    worse_name = config_name("FIRST_CARD", 2, False)
+    equal_name = config_name("FIRST_CARD", 2, True)
+    data["results"][worse_name]["games_per_sec"] *= 1000
+    equal = data["results"][equal_name]
+    equal["games_per_sec"] /= 1000
+    equal["p99_turn_us"] *= 1000
+    equal["peak_memory_kb"] *= 1000
+    with open(baseline, "w") as f:
+        json.dump(data, f)
+
+    result = CliRunner().invoke(run_benchmarks, args + ["-b", baseline])
+    assert result.exit_code == 1
+    report = result.output.split("Regressions:")[1]
+    assert "{} games_per_sec".format(worse_name) in report
+    assert equal_name not in report
@@ -0,0 +1,21 @@
+from cards import encode_card
+from deck_corpus import DeckCorpus, write_corpus
+from game import Game
+from seeding import derive_seed
+
+
+def test_corpus_decks_are_the_seeded_decks(tmp_path):
+    path = str(tmp_path / "decks.bin")
+    write_corpus(path, 7, 30)
+    corpus = DeckCorpus(path)
+    assert (corpus.master_seed, corpus.count) == (7, 30)
+
+    for use_rainbow in (False, True):
+        game = Game(2, "FIRST_CARD", use_rainbow, should_print=False)
+        decks = corpus.get_decks(10, 30, use_rainbow)
+        for index, deck in enumerate(decks.tolist(), 10):
+            game.init_seed(derive_seed(7, index))
+            game.init_deck()
+            expected = [encode_card(c.suit, c.number) for c in game.deck]
+            assert deck == expected
+            assert list(corpus.get_deck(index, use_rainbow)) == expected
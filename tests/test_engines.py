@@ -0,0 +1,49 @@
+import pytest
+
+from batch_game import BatchGame
+from compact_game import CompactGame
+from conftest import WEIGHTS, outcome
+from game import Game
+from players import STRATEGIES
+
+# ROLLOUT plays whole games every turn, so it is left out to keep the suite fast
+TESTED_STRATEGIES = sorted(s for s in STRATEGIES if s != "ROLLOUT")
+SEEDS = range(1, 11)
+
+
+def play(game_class, num_players, strategy, use_rainbow, seed):
+    return outcome(
+        game_class(
+            num_players,
+            strategy,
+            use_rainbow,
+            should_print=False,
+            seed=seed,
+            weights=WEIGHTS,
+        )
+    )
+
+
+@pytest.mark.parametrize("strategy", TESTED_STRATEGIES)
+@pytest.mark.parametrize("num_players", [2, 3, 4, 5])
+@pytest.mark.parametrize("use_rainbow", [False, True])
+def test_compact_game_plays_the_same_games(strategy, num_players, use_rainbow):
+    for seed in SEEDS:
+        assert play(CompactGame, num_players, strategy, use_rainbow, seed) == play(
+            Game, num_players, strategy, use_rainbow, seed
+        )
+
+
+@pytest.mark.parametrize("strategy", BatchGame.SUPPORTED_STRATEGIES)
+@pytest.mark.parametrize("num_players", [2, 3, 4, 5])
+@pytest.mark.parametrize("use_rainbow", [False, True])
+def test_batch_game_plays_the_same_games(strategy, num_players, use_rainbow):
+    batch = BatchGame(num_players, strategy, list(SEEDS), use_rainbow)
+    scores = batch.run_games()
+    batch_outcomes = list(
+        zip(scores.tolist(), batch.wasted_discards.tolist(), batch.turns.tolist())
+    )
+    expected = [
+        play(Game, num_players, strategy, use_rainbow, seed)[:3] for seed in SEEDS
+    ]
+    assert batch_outcomes == expected
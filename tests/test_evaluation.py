@@ -0,0 +1,104 @@
+from collections import defaultdict
+from multiprocessing.pool import ThreadPool
+import random
+
+from evaluation import WeightEvaluator, weights_key
+from search import PARAM_RANGE, CrossEntropySearch
+
+
+def test_race_plays_every_seed_for_a_lone_candidate():
+    with ThreadPool(1) as pool:
+        evaluator = WeightEvaluator(
+            pool, 20, strategy="SORT_3", round_size=10, task_size=10
+        )
+        weights = defaultdict(float)
+        ((score, survived),) = evaluator.race([weights])
+        assert survived
+        assert score == evaluator.evaluate([weights])[0][0]
+
+
+class RecordingPool:
+    """Thread pool that records the weights and seeds of every play_seeds task"""
+
+    def __init__(self):
+        self.pool = ThreadPool(1)
+        self.tasks = []
+
+    def apply_async(self, func, args):
+        ((_, _, _, weights, seeds),) = args
+        self.tasks.append((weights_key(weights), list(seeds)))
+        return self.pool.apply_async(func, args)
+
+    def played_seeds(self):
+        seeds = defaultdict(list)
+        for key, task_seeds in self.tasks:
+            seeds[key] += task_seeds
+        return seeds
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+
+def test_evaluate_plays_a_repeated_candidate_once():
+    pool = RecordingPool()
+    evaluator = WeightEvaluator(pool, 20, round_size=10, task_size=5)
+    weights = defaultdict(float, GAME_SCORE=1)
+    first = evaluator.evaluate([weights, weights.copy()])
+    assert first[0] == first[1]
+    assert evaluator.evaluate([weights]) == first[:1]
+    assert pool.played_seeds() == {weights_key(weights): evaluator.seeds}
+    pool.close()
+
+
+def test_evaluate_plays_every_candidate_on_the_same_seeds():
+    pool = RecordingPool()
+    evaluator = WeightEvaluator(pool, 30, round_size=10, task_size=4)
+    candidates = [
+        defaultdict(float, GAME_SCORE=1),
+        defaultdict(float, GAME_SCORE=1, HINTS=0.3),
+        defaultdict(float, GAME_SCORE=1, KNOWLEDGE_COUNT=0.2, HINTS=0.5),
+    ]
+    evaluator.evaluate(candidates)
+    played = pool.played_seeds()
+    assert len(played) == len(candidates)
+    assert all(seeds == evaluator.seeds for seeds in played.values())
+    pool.close()
+
+
+def test_evaluate_stops_a_clearly_worse_candidate_early():
+    pool = RecordingPool()
+    evaluator = WeightEvaluator(pool, 100, round_size=20, task_size=20)
+    incumbent = defaultdict(float, GAME_SCORE=1)
+    worse = defaultdict(float, GAME_SCORE=1, HINTS=1, KNOWLEDGE_COUNT=1)
+    (worse_result,) = evaluator.evaluate([worse], incumbent=incumbent)
+    ((incumbent_score, complete),) = evaluator.evaluate([incumbent])
+    assert complete
+    assert worse_result[0] < incumbent_score
+    assert not worse_result[1]
+    # It is dropped after its first round, on the incumbent's first seeds
+    assert pool.played_seeds()[weights_key(worse)] == evaluator.seeds[:20]
+    pool.close()
+
+
+class RecordingEvaluator:
+    """Scores candidates by their weights, recording every candidate"""
+
+    def __init__(self):
+        self.candidates = []
+
+    def evaluate(self, candidates, incumbent=None):
+        self.candidates += candidates
+        return [(sum(w.values()), True) for w in candidates]
+
+
+def test_cross_entropy_candidates_stay_in_the_search_range():
+    evaluator = RecordingEvaluator()
+    # Scores grow with the weights, so the distribution is pushed past the top
+    search = CrossEntropySearch(
+        evaluator, ["A", "B"], random.Random(0), population=16, generations=10
+    )
+    search.run()
+    values = [w[p] for w in evaluator.candidates for p in ("A", "B")]
+    assert min(values) >= 0
+    assert max(values) == PARAM_RANGE
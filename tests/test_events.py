@@ -0,0 +1,69 @@
+from collections import Counter
+
+import pytest
+
+from compact_game import CompactGame
+from conftest import game_turns
+from events import (
+    EVENT_DISCARD,
+    EVENT_DRAW,
+    EVENT_HINT,
+    EVENT_MISPLAY,
+    EVENT_PLAY,
+    EVENT_SUIT_COMPLETED,
+)
+from game import Game
+
+EVENTS = [
+    EVENT_DRAW,
+    EVENT_PLAY,
+    EVENT_MISPLAY,
+    EVENT_DISCARD,
+    EVENT_HINT,
+    EVENT_SUIT_COMPLETED,
+]
+
+
+@pytest.mark.parametrize("game_class", [Game, CompactGame])
+def test_events_match_the_game(game_class):
+    for seed in range(1, 21):
+        game = game_class(3, "SORT_3", should_print=False, seed=seed)
+        counts = Counter()
+        for event in EVENTS:
+            game.events.subscribe(
+                event, lambda *args, event=event: counts.update([event])
+            )
+        for _ in game_turns(game):
+            pass
+        played = sum(game.get_played_number(s) for s in game.suits)
+
+        assert counts[EVENT_PLAY] == played == game.get_score()
+        assert counts[EVENT_MISPLAY] == game.fails
+        assert counts[EVENT_DISCARD] == len(game.discarded_cards)
+        assert counts[EVENT_SUIT_COMPLETED] == sum(
+            game.get_played_number(s) == 5 for s in game.suits
+        )
+        # Every card drawn after the deal left the deck
+        assert counts[EVENT_DRAW] == 50 - 15 - len(game.deck)
+        # Every turn is exactly one play, misplay, discard or hint
+        assert game.current_turn == sum(
+            counts[e] for e in (EVENT_PLAY, EVENT_MISPLAY, EVENT_DISCARD, EVENT_HINT)
+        )
+
+
+@pytest.mark.parametrize("game_class", [Game, CompactGame])
+@pytest.mark.parametrize("strategy", ["PROTECT", "BORDERLINE"])
+def test_protect_indexes_follow_the_game(game_class, strategy):
+    for seed in range(1, 11):
+        game = game_class(3, strategy, True, should_print=False, seed=seed)
+        for _ in game_turns(game):
+            endangered = game.get_endangered_cards()
+            needed_numbers = game.get_needed_numbers()
+            for p in game.players:
+                assert p.endangered_cards == {
+                    s: frozenset(endangered[s]) for s in game.suits
+                }
+                if strategy == "BORDERLINE":
+                    assert p.dead_suits == {
+                        s for s in game.suits if s not in needed_numbers
+                    }
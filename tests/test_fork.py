@@ -0,0 +1,31 @@
+import pytest
+
+from compact_game import CompactGame
+from conftest import WEIGHTS, outcome, play_turns
+from game import Game
+
+
+@pytest.mark.parametrize("game_class", [Game, CompactGame])
+@pytest.mark.parametrize("strategy", ["BASIC_QUEUE", "SORT_3", "PROTECT", "INFO"])
+def test_fork_is_independent_of_the_original(game_class, strategy):
+    for seed in range(1, 13):
+        game = game_class(3, strategy, should_print=False, seed=seed, weights=WEIGHTS)
+        play_turns(game, seed)
+        expected = outcome(game.fork())
+
+        fork = game.fork()
+        # The original draws, hints and plays cards the fork still has in its deck
+        game.run_game()
+        assert outcome(fork) == expected
+
+
+@pytest.mark.parametrize("game_class", [Game, CompactGame])
+def test_fork_does_not_change_the_original(game_class):
+    for seed in range(1, 13):
+        expected = outcome(game_class(3, "SORT_3", should_print=False, seed=seed))
+
+        game = game_class(3, "SORT_3", should_print=False, seed=seed)
+        play_turns(game, seed)
+        game.fork().run_game()
+        game.fork(seed=seed + 1).run_game()
+        assert outcome(game) == expected
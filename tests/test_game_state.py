@@ -0,0 +1,65 @@
+import pytest
+
+from compact_game import CompactGame
+from conftest import WEIGHTS, play_turns
+from game import Game
+from players import STRATEGIES
+from validation import VALIDATION_FULL, VALIDATION_LEVELS, check_game_state
+
+TESTED_STRATEGIES = sorted(s for s in STRATEGIES if s != "ROLLOUT")
+
+
+@pytest.mark.parametrize("game_class", [Game, CompactGame])
+@pytest.mark.parametrize("strategy", TESTED_STRATEGIES)
+@pytest.mark.parametrize("use_rainbow", [False, True])
+def test_derived_state_matches_the_cards_every_turn(game_class, strategy, use_rainbow):
+    # Full validation of every game checks the incrementally kept state (score,
+    # needed numbers, remaining cards, possibilities) after every turn
+    for seed in range(1, 6):
+        game = game_class(
+            3,
+            strategy,
+            use_rainbow,
+            should_print=False,
+            seed=seed,
+            weights=WEIGHTS,
+            validation=VALIDATION_FULL,
+        )
+        assert game.check_state
+        game.run_game()
+
+
+@pytest.mark.parametrize("game_class", [Game, CompactGame])
+@pytest.mark.parametrize("strategy", ["BASIC_QUEUE", "SORT_3", "PROTECT", "INFO"])
+def test_validation_levels_play_the_same_games(game_class, strategy):
+    for seed in range(1, 11):
+        outcomes = set()
+        for validation in VALIDATION_LEVELS:
+            game = game_class(
+                3,
+                strategy,
+                should_print=False,
+                seed=seed,
+                weights=WEIGHTS,
+                validation=validation,
+            )
+            outcomes.add((game.run_game(), game.wasted_discards, game.current_turn))
+        assert len(outcomes) == 1
+
+
+def test_check_game_state_catches_corrupted_state():
+    game = Game(3, "SORT_3", should_print=False, seed=1)
+    play_turns(game, 10)
+    check_game_state(game)
+
+    corruptions = [
+        lambda g: g._remaining_counts[g.suits[0]].__setitem__(1, 0),
+        lambda g: setattr(g, "fails", g.fails + 1),
+        lambda g: g.discarded_cards.append(g.deck[0]),
+        lambda g: setattr(list(g.players[0].get_hand())[0], "hinted_number", 9),
+    ]
+    for corrupt in corruptions:
+        corrupted = game.fork()
+        corrupt(corrupted)
+        with pytest.raises(AssertionError):
+            check_game_state(corrupted)
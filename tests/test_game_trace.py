@@ -0,0 +1,135 @@
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from cards import Card, Hint, Suit
+from compact_game import CompactGame
+from conftest import game_turns
+from game import Game
+from game_trace import (
+    ACTION_DISCARD,
+    ACTION_HINT,
+    ACTION_MISPLAY,
+    ACTION_PLAY,
+    HINT_TYPE_NONE,
+    HINT_TYPE_NUMBER,
+    HINT_TYPE_SUIT,
+    NO_VALUE,
+    TraceWriter,
+    read_trace,
+)
+
+# Suit of each suit index in the trace format, written out rather than taken from
+# the encoding code
+TRACE_SUITS = [Suit.WHITE, Suit.RED, Suit.YELLOW, Suit.GREEN, Suit.BLUE, Suit.RAINBOW]
+
+
+def decode_card(code):
+    return TRACE_SUITS[code // 5], code % 5 + 1
+
+
+def turn_state(game):
+    """What a turn can change: the turn and player, the cards left in the game, score,
+    fails and the number of discards"""
+    return (
+        game.current_turn,
+        game.current_player,
+        Counter((c.suit, c.number) for c in game.get_remaining_card_list()),
+        game.get_score(),
+        game.fails,
+        len(game.discarded_cards),
+    )
+
+
+def test_records_are_packed_as_documented(tmp_path):
+    path = str(tmp_path / "game.trace")
+    trace = TraceWriter(path)
+    trace.start_game(7)
+    trace.record_card(12, 2, ACTION_MISPLAY, Card(Suit.YELLOW, 4, None))
+    hinted_player = SimpleNamespace(player_number=2)
+    trace.record_hint(
+        300,
+        1,
+        SimpleNamespace(player=hinted_player, type=Hint.TYPE_SUIT, value=Suit.RAINBOW),
+    )
+    trace.close()
+
+    with open(path, "rb") as f:
+        assert f.read() == (
+            b"\x07\x00\x00\x00\x0c\x00\x02\x01\x0d\xff\x00\xff"
+            b"\x07\x00\x00\x00\x2c\x01\x01\x03\xff\x02\x01\x05"
+        )
+
+
+@pytest.mark.parametrize("game_class", [Game, CompactGame])
+def test_trace_matches_the_turns_of_the_game(game_class, tmp_path):
+    path = str(tmp_path / "game.trace")
+    trace = TraceWriter(path)
+    # What every turn of the games did, as seen from the game's state
+    turns = []
+    for game_index, seed in enumerate(range(1, 4), 5):
+        trace.start_game(game_index)
+        game = game_class(
+            3, "PROTECT", True, should_print=False, seed=seed, trace=trace
+        )
+        before = turn_state(game)
+        for _ in game_turns(game):
+            after = turn_state(game)
+            turn, player, remaining, score, fails, discards = before
+            _, _, remaining_after, score_after, fails_after, discards_after = after
+            left_game = list((remaining - remaining_after).elements())
+            if score_after > score:
+                action = ACTION_PLAY
+            elif fails_after > fails:
+                action = ACTION_MISPLAY
+            elif discards_after > discards:
+                action = ACTION_DISCARD
+            else:
+                action = ACTION_HINT
+            # Cards and their hint knowledge, after the turn
+            hands = [
+                [
+                    (c.suit, c.number, c.hinted_suit, c.hinted_number)
+                    for c in p.get_hand()
+                ]
+                for p in game.players
+            ]
+            turns.append((game_index, turn, player, action, left_game, hands))
+            before = after
+    trace.close()
+
+    records = list(read_trace(path))
+    # Every turn is exactly one play, misplay, discard or hint
+    assert len(records) == len(turns)
+    for record, (game_index, turn, player, action, left_game, hands) in zip(
+        records, turns
+    ):
+        assert (record.game, record.turn, record.player, record.action) == (
+            game_index,
+            turn,
+            player,
+            action,
+        )
+        if action != ACTION_HINT:
+            assert [decode_card(record.card)] == left_game
+            assert (record.hint_player, record.hint_type, record.hint_value) == (
+                NO_VALUE,
+                HINT_TYPE_NONE,
+                NO_VALUE,
+            )
+            continue
+
+        assert record.card == NO_VALUE
+        assert left_game == []
+        # The hinted player now knows the hinted property of every matching card
+        hand = hands[record.hint_player]
+        if record.hint_type == HINT_TYPE_SUIT:
+            suit = TRACE_SUITS[record.hint_value]
+            matching = [c for c in hand if c[0] == suit]
+            assert all(hinted_suit == suit for _, _, hinted_suit, _ in matching)
+        else:
+            assert record.hint_type == HINT_TYPE_NUMBER
+            matching = [c for c in hand if c[1] == record.hint_value]
+            assert all(hinted == record.hint_value for _, _, _, hinted in matching)
+        assert matching
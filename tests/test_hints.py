@@ -0,0 +1,28 @@
+import pytest
+
+from conftest import game_turns
+from game import Game
+
+
+@pytest.mark.parametrize(
+    "strategy", ["SORT_1", "PROTECT", "PROTECT_SORT_2", "BORDERLINE"]
+)
+def test_best_hint_is_the_first_sorted_unique_hint(strategy):
+    for seed in range(1, 6):
+        game = Game(3, strategy, True, should_print=False, seed=seed)
+        for _ in game_turns(game):
+            player = game.players[game.current_player]
+            hints = player.sort_hints(player.find_hints(game.players))
+            keys = [(h.player.player_number, h.type, h.value) for h in hints]
+            assert len(keys) == len(set(keys))
+
+            top_hint, top_score = player.best_hint(player.find_hints(game.players))
+            if hints:
+                assert (top_hint.player, top_hint.type, top_hint.value) == (
+                    hints[0].player,
+                    hints[0].type,
+                    hints[0].value,
+                )
+                assert top_score == player.score_hint(hints[0])
+            else:
+                assert top_hint is None
@@ -0,0 +1,122 @@
+from collections import defaultdict
+
+import pytest
+
+from cards import Hint
+from compact_game import CompactGame
+from conftest import WEIGHTS
+from game import Game
+from players.info_player import DiscardMove, InfoPlayer, PlayMove
+
+
+def move_key(move):
+    if isinstance(move, PlayMove):
+        return ("play", move.card)
+    if isinstance(move, DiscardMove):
+        return ("discard", move.card)
+    hint = move.hint
+    return ("hint", hint.player, hint.type, hint.value)
+
+
+def listed_move_scores(player):
+    """(move key, score) of every legal move, listed and scored one move at a time
+    against the whole game, as InfoPlayer did before scoring in one pass"""
+    game = player.game
+    knowledge_count = sum(
+        bool(c.hinted_suit) + bool(c.hinted_number)
+        for p in game.players
+        for c in p.get_hand()
+    )
+
+    scores = []
+    for card in player.hand:
+        possible_cards = [
+            c
+            for c in game.get_remaining_card_list()
+            if (not card.hinted_suit or card.hinted_suit == c.suit)
+            and (not card.hinted_number or card.hinted_number == c.number)
+        ]
+        playable = [c for c in possible_cards if game.is_card_playable(c)]
+        playable_fives = [c for c in playable if c.number == 5]
+        avg_score_increase = round(len(playable) / len(possible_cards), 4)
+        avg_fail_increase = round(1 - avg_score_increase, 4)
+        avg_hint_increase = round(len(playable_fives) / len(possible_cards), 4)
+        score = player.score_state(
+            game.get_score() + avg_score_increase,
+            knowledge_count,
+            game.hints + avg_hint_increase,
+            game.fails + avg_fail_increase,
+        )
+        scores.append((("play", card), score))
+        if game.hints < 8:
+            score = player.score_state(
+                game.get_score(), knowledge_count, game.hints + 1, game.fails
+            )
+            scores.append((("discard", card), score))
+
+    if game.hints > 0:
+        for p in game.players:
+            hand = p.get_hand()
+            for suit in game.suits:
+                if suit in [c.suit for c in hand]:
+                    increase = sum(c.suit == suit and not c.hinted_suit for c in hand)
+                    score = player.score_state(
+                        game.get_score(),
+                        knowledge_count + increase,
+                        game.hints,
+                        game.fails,
+                    )
+                    scores.append((("hint", p, Hint.TYPE_SUIT, suit), score))
+            for number in range(1, game.MAX_NUMBER):
+                if number in [c.number for c in hand]:
+                    increase = sum(
+                        c.number == number and not c.hinted_number for c in hand
+                    )
+                    score = player.score_state(
+                        game.get_score(),
+                        knowledge_count + increase,
+                        game.hints,
+                        game.fails,
+                    )
+                    scores.append((("hint", p, Hint.TYPE_NUMBER, number), score))
+    return scores
+
+
+@pytest.mark.parametrize("game_class", [Game, CompactGame])
+@pytest.mark.parametrize(
+    "weights",
+    [
+        WEIGHTS,
+        defaultdict(int, GAME_SCORE=1),
+        defaultdict(int, GAME_SCORE=1, KNOWLEDGE_COUNT=0.2, HINTS=0.5),
+    ],
+)
+def test_take_turn_picks_the_best_listed_move(game_class, weights, monkeypatch):
+    executed = []
+    execute = InfoPlayer.execute
+
+    def recording_execute(self, move):
+        executed.append(move_key(move))
+        execute(self, move)
+
+    monkeypatch.setattr(InfoPlayer, "execute", recording_execute)
+    for seed in range(1, 6):
+        game = game_class(
+            3, "INFO", True, should_print=False, seed=seed, weights=weights
+        )
+        while (
+            game.fails < 3
+            and game.turn_timer >= 0
+            and game.get_score() < 5 * len(game.suits)
+        ):
+            player = game.players[game.current_player]
+            # The first listed move wins ties
+            best_move, best_score = None, -1
+            for move, score in listed_move_scores(player):
+                if score > best_score:
+                    best_move, best_score = move, score
+
+            executed.clear()
+            player.take_turn()
+            game.end_turn()
+            assert executed == [best_move]
@@ -0,0 +1,52 @@
+import multiprocessing as mp
+from multiprocessing.pool import ThreadPool
+
+import pytest
+
+from conftest import WEIGHTS
+from game import Game
+from main import chunk_ranges, get_game_args, perfect_score, play_chunk
+from stats import ScoreAccumulator
+
+MASTER_SEED = 7
+
+
+def chunks(strategy, num_games, chunk_size):
+    """play_chunk arguments for every chunk of a run, as run_simulations builds them"""
+    game_args = get_game_args(3, strategy, False, WEIGHTS)
+    return [
+        (Game, game_args, None, MASTER_SEED, start, stop, None, True, None)
+        for start, stop in chunk_ranges(num_games, chunk_size)
+    ]
+
+
+def test_threads_play_the_same_games_as_a_serial_run():
+    for strategy in ["SORT_3", "PROTECT", "INFO"]:
+        ((_, serial),) = map(play_chunk, chunks(strategy, 40, 40))
+        with ThreadPool(4) as pool:
+            threaded = [
+                outcome
+                for _, outcomes in pool.imap(play_chunk, chunks(strategy, 40, 7))
+                for outcome in outcomes
+            ]
+        assert threaded == serial
+
+
+def test_worker_chunks_merge_to_the_serial_results():
+    ((serial, serial_outcomes),) = map(play_chunk, chunks("SORT_3", 60, 60))
+    merged = ScoreAccumulator(perfect_score(False))
+    outcomes = []
+    with mp.Pool(2) as pool:
+        for accumulator, chunk_outcomes in pool.imap(
+            play_chunk, chunks("SORT_3", 60, 11)
+        ):
+            merged.merge(accumulator)
+            outcomes += chunk_outcomes
+
+    assert outcomes == serial_outcomes
+    assert merged.histogram == serial.histogram
+    assert merged.count == serial.count
+    assert merged.score_sum == serial.score_sum
+    assert merged.score_square_sum == serial.score_square_sum
+    # Chunks sum their float percentages separately, so only the rounding can differ
+    assert merged.wasted_discard_pct_sum == pytest.approx(serial.wasted_discard_pct_sum)
@@ -0,0 +1,29 @@
+from collections import Counter
+
+import pytest
+
+from compact_game import CompactGame
+from events import EVENT_DISCARD, EVENT_MISPLAY, EVENT_PLAY
+from game import Game
+from profiling import PhaseProfile, profiled_game_class
+
+
+@pytest.mark.parametrize("game_class", [Game, CompactGame])
+def test_profile_leaves_out_the_deal(game_class):
+    profile = PhaseProfile()
+    game = profiled_game_class(game_class, profile)(
+        3, "SORT_3", should_print=False, seed=1
+    )
+    counts = Counter()
+    for event in (EVENT_PLAY, EVENT_MISPLAY, EVENT_DISCARD):
+        game.events.subscribe(event, lambda card, event=event: counts.update([event]))
+    turns = 0
+    for seed in range(1, 4):
+        if seed != 1:
+            game.reset(seed)
+        game.run_game()
+        turns += game.current_turn
+
+    # Every play, misplay and discard draws a card, even from an empty deck
+    assert profile.calls["Game.draw"] == sum(counts.values())
+    assert profile.calls["take_turn"] == turns
@@ -0,0 +1,72 @@
+import pytest
+
+from compact_game import CompactGame
+from conftest import WEIGHTS, outcome, play_turns
+from deck_corpus import deck_codes
+from game import Game
+
+SEEDS = range(1, 21)
+
+
+def new_game(game_class, strategy, use_rainbow, seed, codes=None):
+    return game_class(
+        3,
+        strategy,
+        use_rainbow,
+        should_print=False,
+        seed=seed,
+        weights=WEIGHTS,
+        deck_codes=codes,
+    )
+
+
+@pytest.mark.parametrize("game_class", [Game, CompactGame])
+@pytest.mark.parametrize("strategy", ["FIRST_CARD", "SORT_3", "BORDERLINE", "INFO"])
+@pytest.mark.parametrize("use_rainbow", [False, True])
+def test_reset_plays_the_same_games_as_new_games(game_class, strategy, use_rainbow):
+    game = new_game(game_class, strategy, use_rainbow, SEEDS[0])
+    for seed in SEEDS:
+        if seed != SEEDS[0]:
+            game.reset(seed)
+        assert outcome(game) == outcome(
+            new_game(game_class, strategy, use_rainbow, seed)
+        )
+
+
+@pytest.mark.parametrize("game_class", [Game, CompactGame])
+def test_reset_deals_deck_codes(game_class):
+    game = new_game(game_class, "SORT_3", False, 1)
+    for seed in SEEDS:
+        codes = deck_codes(seed, False)
+        game.reset(seed, codes)
+        assert outcome(game) == outcome(new_game(game_class, "SORT_3", False, 1, codes))
+
+
+@pytest.mark.parametrize("game_class", [Game, CompactGame])
+def test_reset_leaves_forks_of_the_last_game_alone(game_class):
+    game = new_game(game_class, "SORT_3", False, 1)
+    for seed in SEEDS:
+        game.reset(seed)
+        play_turns(game, seed)
+        expected = outcome(game.fork())
+        fork = game.fork()
+        game.reset(seed + 1)
+        game.run_game()
+        assert outcome(fork) == expected
+
+
+def test_reset_reuses_cards_no_fork_shares():
+    game = new_game(Game, "SORT_3", False, 1)
+    cards = set(game.deck) | {c for p in game.players for c in p.get_hand()}
+    game.run_game()
+    game.reset(2)
+    assert set(game.deck) <= cards
+
+    # The fork may still hold the cards, so the next reset makes new ones, which the
+    # reset after that reuses again
+    game.fork()
+    game.reset(3)
+    assert not set(game.deck) & cards
+    cards = set(game.deck) | {c for p in game.players for c in p.get_hand()}
+    game.reset(4)
+    assert set(game.deck) <= cards
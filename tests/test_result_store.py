@@ -0,0 +1,35 @@
+import events
+from compact_game import CompactGame
+from game import Game
+from players import info_player, protecting_player
+from result_store import ResultStore, code_fingerprint, engine_modules
+
+
+def test_load_only_returns_the_requested_seeds(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    config = store.config_key(Game, "SORT_3", 3, False, {})
+    other_config = store.config_key(Game, "SORT_3", 4, False, {})
+    store.save(config, [(seed, 20, 1, 60) for seed in range(1, 101)])
+    store.save(other_config, [(5, 10, 0, 50)])
+
+    assert store.load(config, [5, 50, 500]) == {5: (20, 1, 60), 50: (20, 1, 60)}
+    assert store.load(other_config, [5, 50]) == {5: (10, 0, 50)}
+    assert store.load(config, []) == {}
+    store.close()
+
+
+def test_engines_have_their_own_configs(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    assert store.config_key(Game, "SORT_3", 3, False, {}) != store.config_key(
+        CompactGame, "SORT_3", 3, False, {}
+    )
+    store.close()
+
+
+def test_fingerprint_covers_the_engine_and_the_strategy_alone():
+    modules = engine_modules(Game, "PROTECT")
+    assert events in modules
+    assert protecting_player in modules
+    assert info_player not in modules
+    assert protecting_player not in engine_modules(Game, "SORT_3")
+    assert code_fingerprint(Game, "SORT_3") != code_fingerprint(CompactGame, "SORT_3")
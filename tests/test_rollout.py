@@ -0,0 +1,78 @@
+from collections import Counter
+import random
+
+import pytest
+
+from compact_game import CompactGame
+from conftest import play_turns
+from game import Game
+from players.rollout_player import close_pools
+
+
+def rollout_game(game_class, seed, rollouts=2, workers=1):
+    return game_class(
+        3,
+        "ROLLOUT",
+        should_print=False,
+        seed=seed,
+        weights=dict(ROLLOUTS=rollouts, ROLLOUT_WORKERS=workers),
+    )
+
+
+@pytest.mark.parametrize("game_class", [Game, CompactGame])
+def test_redeal_keeps_hint_knowledge_and_the_cards(game_class):
+    for seed in range(1, 6):
+        game = rollout_game(game_class, seed)
+        play_turns(game, 12)
+        for player in game.players:
+            fork = game.fork()
+            forked_player = fork.players[player.player_number]
+            hand = list(forked_player.get_hand())
+            knowledge = [(c.hinted_suit, c.hinted_number) for c in hand]
+            values = Counter(fork.get_deck_values())
+            values.update((c.suit, c.number) for c in hand)
+
+            for k in range(20):
+                rng = random.Random(k)
+                if not fork.redeal_hidden_cards(
+                    forked_player, rng, forked_player.could_be
+                ):
+                    continue
+                hand = list(forked_player.get_hand())
+                assert [(c.hinted_suit, c.hinted_number) for c in hand] == knowledge
+                for c in hand:
+                    assert c.hinted_suit is None or c.hinted_suit == c.suit
+                    assert c.hinted_number is None or c.hinted_number == c.number
+                    assert forked_player.could_be(c, c.suit, c.number)
+
+                redealt = Counter(fork.get_deck_values())
+                redealt.update((c.suit, c.number) for c in hand)
+                assert redealt == values
+
+
+def test_worker_count_does_not_change_the_rollouts():
+    try:
+        for seed in range(1, 4):
+            totals = []
+            for workers in (1, 3):
+                game = rollout_game(Game, seed, rollouts=6, workers=workers)
+                play_turns(game, 6)
+                player = game.players[game.current_player]
+                moves = player.get_moves()
+                totals.append((moves, player.score_moves(moves)))
+            assert totals[0] == totals[1]
+    finally:
+        close_pools()
+
+
+def test_skipped_rollouts_are_counted(monkeypatch):
+    game = rollout_game(Game, 1, rollouts=4)
+    play_turns(game, 3)
+    player = game.players[game.current_player]
+    monkeypatch.setattr(Game, "redeal_hidden_cards", lambda *args: False)
+    moves = player.get_moves()
+    assert player.score_moves(moves) == [0] * len(moves)
+    assert player.skipped_rollouts == 4
+
+    game.reset(2)
+    assert player.skipped_rollouts == 0
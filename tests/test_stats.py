@@ -0,0 +1,78 @@
+from collections import defaultdict
+from math import inf, sqrt
+
+from click.testing import CliRunner
+import numpy as np
+import pytest
+
+from game import Game
+from main import compare_strategies, get_game_seeds, result_row, run_simulations
+from stats import PairedDifference, ScoreAccumulator
+
+
+def test_score_accumulator_matches_numpy():
+    rng = np.random.default_rng(0)
+    for size in [1, 2, 7, 100, 1001]:
+        scores = rng.integers(0, 26, size)
+        whole = ScoreAccumulator(25)
+        halves = [ScoreAccumulator(25), ScoreAccumulator(25)]
+        for i, score in enumerate(scores.tolist()):
+            whole.add(score, 0)
+            halves[i % 2].add(score, 0)
+        merged = ScoreAccumulator(25)
+        for half in halves:
+            merged.merge(half)
+
+        for accumulator in [whole, merged]:
+            assert accumulator.count == size
+            assert accumulator.mean() == pytest.approx(np.mean(scores))
+            assert accumulator.std() == pytest.approx(np.std(scores))
+            for p in [10, 50, 90]:
+                assert accumulator.percentile(p) == np.percentile(scores, p)
+
+
+def test_empty_accumulators_report_zeros():
+    assert result_row("SORT_3", ScoreAccumulator(25))[1:] == [0] * 7
+    assert PairedDifference().mean() == 0
+
+
+def test_paired_difference_matches_numpy():
+    rng = np.random.default_rng(0)
+    diffs = rng.integers(0, 26, 500) - rng.integers(0, 26, 500)
+    difference = PairedDifference()
+    assert difference.interval(3) == (-inf, inf)
+    for diff in diffs.tolist():
+        difference.add(diff)
+
+    std = np.std(diffs, ddof=1)
+    assert difference.mean() == pytest.approx(np.mean(diffs))
+    assert difference.std() == pytest.approx(std)
+    low, high = difference.interval(3)
+    assert low == pytest.approx(np.mean(diffs) - 3 * std / sqrt(len(diffs)))
+    assert high == pytest.approx(np.mean(diffs) + 3 * std / sqrt(len(diffs)))
+
+
+def test_compare_stops_once_the_difference_is_settled():
+    table = compare_strategies(
+        Game, 3, ["SORT_3", "FIRST_CARD"], False, defaultdict(int), 0, 400, 25, 50, 3
+    )
+    seeds = list(get_game_seeds(None, 0, 0, 50))
+    diffs = [
+        Game(3, "SORT_3", should_print=False, seed=seed).run_game()
+        - Game(3, "FIRST_CARD", should_print=False, seed=seed).run_game()
+        for seed in seeds
+    ]
+    row = next(line for line in table.splitlines() if "SORT_3 - FIRST_CARD" in line)
+    cells = [cell.strip() for cell in row.strip("|").split("|")]
+    assert cells[1] == "50"
+    assert float(cells[2]) == round(np.mean(diffs), 3)
+    assert cells[5] == "SORT_3 better"
+
+
+@pytest.mark.parametrize("flag", [["--verbose"], ["--progress-every", "10"]])
+def test_compare_rejects_flags_it_ignores(flag):
+    result = CliRunner().invoke(
+        run_simulations, ["10", "--compare", "-s", "SORT_3", "-s", "INFO"] + flag
+    )
+    assert result.exit_code == 2
+    assert "--compare can't be used with" in result.output
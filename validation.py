@@ -0,0 +1,112 @@
+from collections import Counter
+import sys
+
+from seeding import derive_seed
+
+# No invariant checks, for throughput runs
+VALIDATION_OFF = "off"
+# The constant-time per-call checks strategies and cards make, e.g. that hints match
+# the real cards
+VALIDATION_CHEAP = "cheap"
+# Cheap checks, plus the checks that compare whole hands (e.g. that regrouped queues
+# hold the cards of the hand) and check_game_state after every turn of a sample of games
+VALIDATION_FULL = "full"
+
+VALIDATION_LEVELS = [VALIDATION_OFF, VALIDATION_CHEAP, VALIDATION_FULL]
+
+
+def is_sampled(seed, sample):
+    """Whether the game with seed is in the given fraction of games. It only depends
+    on the seed, so a run validates the same games however it is split up"""
+    return derive_seed(seed, 0) < sample * sys.maxsize
+
+
+def check_game_state(game):
+    """Checks that the whole state of game (Game or CompactGame) is consistent, with
+    game.assert_:
+      - the deck, hands, discards, played cards and misplayed cards (one per fail) are
+        exactly the cards of a full deck
+      - cards left in the game (deck and hands) match the remaining counts, remaining
+        card list and possibility index the game keeps up to date
+      - needed numbers and score match the played numbers
+      - every card's hint knowledge agrees with the real card
+      - hints and fails are within bounds
+    Costs as much as a few turns, so it is meant for a sample of games."""
+    suits = game.suits
+    game.assert_(0 <= game.hints <= 8, "hints out of bounds")
+    game.assert_(0 <= game.fails <= 3, "fails out of bounds")
+
+    hand_cards = [c for p in game.players for c in p.get_hand()]
+    hand_size = 5 if game.num_players < 4 else 4
+    for p in game.players:
+        game.assert_(len(list(p.get_hand())) <= hand_size, "hand too large")
+    for c in hand_cards:
+        game.assert_(c.game is game, "hand card belongs to another game")
+        game.assert_(
+            c.hinted_suit is None or c.hinted_suit == c.suit, "wrong suit knowledge"
+        )
+        game.assert_(
+            c.hinted_number is None or c.hinted_number == c.number,
+            "wrong number knowledge",
+        )
+
+    remaining = Counter(game.get_deck_values())
+    remaining.update((c.suit, c.number) for c in hand_cards)
+    game.assert_(
+        remaining
+        == Counter((c.suit, c.number) for c in game.get_remaining_card_list()),
+        "remaining card list doesn't match the deck and hands",
+    )
+    remaining_counts = game.get_remaining_cards()
+    for suit in suits:
+        for number in game.NUMBER_COUNTS:
+            game.assert_(
+                remaining[(suit, number)] == remaining_counts[suit][number],
+                "remaining counts don't match the deck and hands",
+            )
+
+    # Whatever is missing from a full deck was misplayed, once per fail
+    missing = Counter(
+        {(s, n): count for s in suits for n, count in game.NUMBER_COUNTS.items()}
+    )
+    missing.subtract(remaining)
+    missing.subtract((c.suit, c.number) for c in game.discarded_cards)
+    score = 0
+    for suit in suits:
+        played_number = game.get_played_number(suit)
+        score += played_number
+        missing.subtract((suit, n) for n in range(1, played_number + 1))
+    game.assert_(min(missing.values()) >= 0, "more cards than a full deck")
+    game.assert_(sum(missing.values()) == game.fails, "misplays don't match fails")
+
+    needed_numbers = game.get_needed_numbers()
+    game.assert_(game.get_score() == score, "score doesn't match played numbers")
+    game.assert_(
+        dict(needed_numbers)
+        == {
+            s: game.get_played_number(s) + 1
+            for s in suits
+            if game.get_played_number(s) < 5
+        },
+        "needed numbers don't match played numbers",
+    )
+
+    possibilities = game.get_card_possibilities()
+    counts = dict.fromkeys(possibilities.counts, 0)
+    playable_counts = counts.copy()
+    playable_five_counts = counts.copy()
+    for (suit, number), count in remaining.items():
+        is_playable = needed_numbers.get(suit) == number
+        for key in possibilities.get_keys(suit, number):
+            counts[key] += count
+            if is_playable:
+                playable_counts[key] += count
+                if number == 5:
+                    playable_five_counts[key] += count
+    game.assert_(
+        possibilities.counts == counts
+        and possibilities.playable_counts == playable_counts
+        and possibilities.playable_five_counts == playable_five_counts
+        and possibilities.needed_numbers == dict(needed_numbers),
+        "card possibilities don't match the deck and hands",
+    )